@@ -0,0 +1,175 @@
+# bench_dice.py
+#
+# Dice micro-benchmarks
+#
+# usage (from repository root):
+#   python -m benchmarks.bench_dice                          # run and compare to stored baseline (fails if missing)
+#   python -m benchmarks.bench_dice --update-baseline        # run and store results as new baseline
+#   python -m benchmarks.bench_dice --output results.json --threshold 0.10
+#
+# The regression check is local-only: timings depend on the machine and its load, so the
+# stored baseline is only meaningful on the machine that recorded it (re-record it with
+# --update-baseline on a new machine before comparing).
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+from lib.dice import Dice
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "bench_dice_baseline.json")
+DEFAULT_NUMBER = 2000
+DEFAULT_REPEAT = 15
+DEFAULT_THRESHOLD = 0.50  # fail if any case is more than 50% slower than baseline
+
+DIE_SIDES = [4, 6, 8, 10, 12, 20, 100]
+DICE_GRID = [  # (die_sides, dice_number, die_modifier, roll_modifier)
+    (4, 1, 0, 0),
+    (6, 3, 0, 0),
+    (8, 2, 0, 1),
+    (10, 5, 1, 0),
+    (12, 1, 0, 2),
+    (20, 10, 0, 0),
+]
+DNN_DICE_NUMBERS = [1, 3]
+
+
+def get_cases(dice: type, label: str) -> dict:
+    """get benchmark cases for a Dice class
+
+    args:
+        dice: type - Dice class (plain or buffered)
+        label: str - case name prefix
+    returns:
+        dict: case name -> callable
+    """
+    cases = {}
+    for die_sides in DIE_SIDES:
+        cases[f"{label}.roll_die(d{die_sides})"] = lambda s=die_sides: dice.roll_die(s)
+
+    for die_sides, dice_number, die_modifier, roll_modifier in DICE_GRID:
+        name = f"{label}.roll_dice({dice_number}d{die_sides}/{die_modifier:+d}/{roll_modifier:+d})"
+        cases[name] = lambda a=(die_sides, dice_number, die_modifier, roll_modifier): dice.roll_dice(*a)
+
+    for die_sides in DIE_SIDES:
+        roll = getattr(dice, f"roll_d{die_sides}")
+        for dice_number in DNN_DICE_NUMBERS:
+            cases[f"{label}.roll_d{die_sides}({dice_number})"] = lambda r=roll, n=dice_number: r(n)
+
+    return cases
+
+
+def get_encounter_cases(dice: type, label: str) -> dict:
+    """get Encounter initiative benchmark cases
+
+    args:
+        dice: type - Dice class (plain or buffered)
+        label: str - case name prefix
+    returns:
+        dict: case name -> callable
+    """
+    import lib.combatmodel as cm1
+
+    # bypass Encounter.__init__ (no database connection needed to roll initiative)
+    encounter = cm1.Encounter.__new__(cm1.Encounter)
+    encounter.dice = dice
+    return {f"{label}.Encounter.roll_nonplayer_initiative": encounter.roll_nonplayer_initiative}
+
+
+def run(number: int, repeat: int) -> dict:
+    """run all benchmark cases
+
+    args:
+        number: int - calls per timing
+        repeat: int - timings per case (median is kept)
+    returns:
+        dict: case name -> microseconds per call
+    """
+    cases = {}
+    for dice, label in [(Dice, "Dice"), (Dice.buffered(), "Dice.buffered")]:
+        cases.update(get_cases(dice, label))
+        cases.update(get_encounter_cases(dice, label))
+
+    results = {}
+    for name, case in cases.items():
+        median = statistics.median(timeit.repeat(case, number=number, repeat=repeat))
+        results[name] = round(median / number * 1e6, 4)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """compare results to baseline
+
+    args:
+        results: dict - case name -> microseconds per call
+        baseline: dict - case name -> microseconds per call
+        threshold: float - allowed fractional slowdown
+    returns:
+        list: regressions (name, baseline, result, ratio)
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or baseline[name] <= 0:
+            continue
+
+        ratio = result / baseline[name]
+        if ratio > 1 + threshold:
+            regressions.append((name, baseline[name], result, ratio))
+
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Dice micro-benchmarks")
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timings per case")
+    parser.add_argument("--output", help="write JSON results to file (default: stdout)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed fractional slowdown vs. baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="store results as new baseline")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "unit": "usec/call",
+        "results": run(args.number, args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(output)
+
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline '{args.baseline}' found (use --update-baseline)", file=sys.stderr)
+        return 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = compare(report["results"], baseline, args.threshold)
+    for name, baseline_result, result, ratio in regressions:
+        print(f"REGRESSION {name}: {baseline_result} -> {result} usec/call ({ratio:.2f}x)", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
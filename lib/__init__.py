@@ -6,14 +6,39 @@ from lib.combatdatafactory import(
     CombatDataFactory,
 )
 
+from lib.combatdatawriter import(
+    CombatDataWriter,
+)
+
 from lib.combatmodel import(
     Combatant, 
+    CombatantStore,
     Encounter,
+    InitiativeScheduler,
+    ParticipantTemplate,
+    RegenerationScheduler,
     Saving_Throw,
+    SavingThrowTable,
 )
 
 from lib.dice import(
     Dice,
+    DiceBuffer,
+    DiceDistribution,
+    DiceStreams,
+)
+
+from lib.diceexpression import(
+    DamagePlan,
+    DiceTerm,
+)
+
+from lib.participantrepository import(
+    ParticipantRepository,
+)
+
+from lib.session import(
+    SessionManager,
 )
 
 from lib.sqldb import(
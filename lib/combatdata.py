@@ -1,16 +1,72 @@
 #combatdata.py
 
+import atexit
+import time
+
 class CombatData():
+    LOG_COLUMNS = (
+        'encounter', 'round',
+        'Attacker_type', 'Attacker_Abbr', 'Attacker_seq', 'Attacker_group', 'Attacker_initiative', 'Attacker_attack_number',
+        'Defender_type', 'Defender_Abbr', 'Defender_seq', 'Defender_group', 'Defender_initiative', 'Defender_hp_max', 'Defender_hp', 'Defender_damage',
+        'xp_total', 'xp_earned', 'notes',
+    )
+    LOG_BUFFER_SIZE    = 100    # queued log rows that trigger a flush
+    LOG_BUFFER_SECONDS = 10.0   # age (seconds) of oldest queued log row that triggers a flush
+    PARTICIPANT_BOOLEAN_COLUMNS = ('MissileAttack', 'RegenerationAfterDamage', 'ExperienceAddHitPoint')
+    PARTICIPANT_QUERY_ABBRS  = 100  # Abbrs per IN (...) query
+
     def __init__(self):
         self.is_core   = False
         self.is_odbc   = False
         self.is_orm    = False        
         self.is_native = False
 
+        # write-behind log buffer (flushed per attack, per round, on threshold, on close and at exit)
+        self.log_buffer: list = []
+        self.log_buffer_time: float = 0.0
+        atexit.register(self.flush_log_actions)
+
+    def check_errors(self) -> None:
+        """raise failed asynchronous write (none: writes are synchronous)"""
+        pass
+
     def close(self) -> None:
-        """close database connection"""
+        """flush queued log rows and close database connection"""
+        self.flush_log_actions()
+        atexit.unregister(self.flush_log_actions)
         self.db.close()
 
+    def execute_many(self, sql: str, rows: list) -> bool:
+        """execute one parameterized statement for many rows as a single batch and commit
+
+        Only native and odbc database methods run raw SQL ([name] quoting works on both).
+
+        args:
+            sql: parameterized SQL statement
+            rows: list of parameter tuples
+        returns:
+            bool: True if executed, False if not supported by database method
+        """
+        if not (self.is_native or self.is_odbc):
+            return False
+
+        self.db.cursor.executemany(sql, rows)
+        if self.is_odbc:
+            self.db.cursor.commit()
+        else:
+            self.db.connection.commit()
+
+        return True
+
+    def flush_log_actions(self) -> None:
+        """insert all queued log rows into database log table as one batch"""
+        if not self.log_buffer:
+            return
+
+        actions: list = self.log_buffer
+        self.log_buffer = []
+        self.log_actions(actions)
+
     def load_combatants(self) -> None:
         """load encounter combatants"""
         self.combatants: dict = self.load_sql('Combatant')
@@ -19,6 +75,39 @@ class CombatData():
         """load participants from database into dictionary"""
         self.participants: dict = self.load_sql('Participant')
 
+    def load_participants_by_abbr(self, abbrs: list) -> dict:
+        """load only the participants with given Abbrs from database (bulk IN queries)
+
+        Database methods not running raw SQL (orm, core) filter the full participant load.
+
+        args:
+            abbrs: list of Abbr
+        returns:
+            dict: Abbr: participant row
+        """
+        if not abbrs:
+            return {}
+
+        if not (self.is_native or self.is_odbc):
+            wanted: set = set(abbrs)
+            return {abbr: participant for abbr, participant in self.load_sql('Participant').items() if abbr in wanted}
+
+        participants: dict = {}
+        for start in range(0, len(abbrs), self.PARTICIPANT_QUERY_ABBRS):
+            chunk: list = list(abbrs[start:start + self.PARTICIPANT_QUERY_ABBRS])
+            values: str = ', '.join('?' for _ in chunk)
+            self.db.cursor.execute(f"select * from [Participant] where [Abbr] in ({values})", chunk)
+            columns: list = [description[0] for description in self.db.cursor.description]
+            for row in self.db.cursor.fetchall():
+                participant: dict = dict(zip(columns, row))
+                for column in self.PARTICIPANT_BOOLEAN_COLUMNS:
+                    if isinstance(participant.get(column), str):
+                        participant[column] = participant[column] == 'True'  # SQLite stores booleans as text
+
+                participants[participant['Abbr']] = participant
+
+        return participants
+
     def load_saving_throws(self) -> None:
         """load saving throws from database into dictionary"""
         self.savingthrows: dict = self.load_sql('SavingThrow')
@@ -37,4 +126,58 @@ class CombatData():
             hp_original: combatant original hit points
             hp: combatant hit points
         """
-        self.log_action(encounter, round, type, Abbr, seq, group, initiative, 0, 'N/A', 'N/A', 0, 'N/A', 0, hp_original, hp, 0, 0, 0, 'initiative')
+        self.queue_log_action(encounter, round, type, Abbr, seq, group, initiative, 0, 'N/A', 'N/A', 0, 'N/A', 0, hp_original, hp, 0, 0, 0, 'initiative')
+
+    def log_actions(self, actions: list) -> None:
+        """insert many log_action rows into database log table as one batch
+
+        args:
+            actions: list of log_action argument tuples
+        """
+        if not actions:
+            return
+
+        columns: str = ', '.join(f'[{column}]' for column in self.LOG_COLUMNS)
+        values: str = ', '.join('?' for _ in self.LOG_COLUMNS)
+        if self.execute_many(f"insert into [Log] ({columns}) values ({values})", actions):
+            return
+
+        for action in actions:
+            self.log_action(*action)
+
+    def queue_log_action(self, *action) -> None:
+        """queue log row for a later batch insert (same arguments as log_action)"""
+        self.queue_log_actions([action])
+
+    def queue_log_actions(self, actions: list) -> None:
+        """queue log rows for a later batch insert, flushing once size or age threshold is reached
+
+        args:
+            actions: list of log_action argument tuples
+        """
+        if not self.log_buffer:
+            self.log_buffer_time = time.monotonic()
+
+        self.log_buffer.extend(actions)
+        if (
+            len(self.log_buffer) >= self.LOG_BUFFER_SIZE
+            or time.monotonic() - self.log_buffer_time >= self.LOG_BUFFER_SECONDS
+        ):
+            self.flush_log_actions()
+
+    def update_combatants_hit_points(self, hitpoints: list) -> None:
+        """update many combatants' hit points as one batch
+
+        args:
+            hitpoints: list of (CombatType, Abbr, seq, hpmax, hp) tuples
+        """
+        if not hitpoints:
+            return
+
+        sql: str = "update [Combatant] set [hpmax] = ?, [hp] = ? where [CombatType] = ? and [Abbr] = ? and [seq] = ?"
+        rows: list = [(hpmax, hp, combattype, abbr, seq) for combattype, abbr, seq, hpmax, hp in hitpoints]
+        if self.execute_many(sql, rows):
+            return
+
+        for combattype, abbr, seq, hpmax, hp in hitpoints:
+            self.update_combatant_hit_points(combattype, abbr, seq, hpmax, hp)
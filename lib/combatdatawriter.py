@@ -0,0 +1,143 @@
+# combatdatawriter.py
+
+import atexit
+import queue
+import threading
+
+from lib.combatdata import CombatData
+import lib.combatdatafactory as cdf1
+
+
+class CombatDataWriter:
+    """asynchronous persistence: write operations are queued and run by a writer thread
+
+    The writer thread owns its own data connection (created in that thread). Reads go to
+    the wrapped connection after all queued writes are done. A full queue blocks the caller
+    (backpressure); a failed write is raised on the next call (or check_errors()).
+
+    Trade-off: reads and writes use different connections. Reads wait for the queue to
+    drain, but a backend may not show another connection's committed writes right away
+    (i.e. Access over ODBC), so a reload can briefly be stale.
+    """
+
+    QUEUE_SIZE = 1000
+
+    # CombatData methods run by the writer thread
+    WRITE_METHODS = frozenset(
+        {
+            "delete_dead_foes",
+            "flush_log_actions",
+            "log_action",
+            "log_actions",
+            "log_initiative",
+            "queue_log_action",
+            "queue_log_actions",
+            "update_combatant_hit_points",
+            "update_combatants_hit_points",
+        }
+    )
+
+    def __init__(
+        self, combat_data: CombatData, combat_data_factory=None, queue_size: int = None
+    ) -> None:
+        """
+        args:
+            combat_data: CombatData - data connection used for reads
+            combat_data_factory: factory with create_combatdata() (default: CombatDataFactory)
+            queue_size: int - maximum queued write operations (default: QUEUE_SIZE)
+        """
+        self.combat_data: CombatData = combat_data
+        self.combat_data_factory = combat_data_factory or cdf1.CombatDataFactory()
+        self.queue: queue.Queue = queue.Queue(
+            self.QUEUE_SIZE if queue_size is None else queue_size
+        )
+        self.error: Exception = None  # first failed write not yet raised
+        self.connected = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name=__class__.__name__, daemon=True
+        )
+        self.thread.start()
+        self.connected.wait()
+        self.check_errors()
+        atexit.register(self.close)  # drain queue on the writer thread at exit
+
+    def __getattr__(self, name: str):
+        if name in self.WRITE_METHODS:
+            return lambda *args: self.submit(name, *args)
+
+        return getattr(self.combat_data, name)
+
+    def check_errors(self) -> None:
+        """raise first failed write (if any)"""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self) -> None:
+        """run all queued writes, stop writer thread and close both data connections"""
+        atexit.unregister(self.close)
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+        self.combat_data.close()
+        self.check_errors()
+
+    def join(self) -> None:
+        """wait until all queued writes are done"""
+        self.queue.join()
+        self.check_errors()
+
+    def load_combatants(self) -> None:
+        """load encounter combatants (after queued writes)"""
+        self.join()
+        self.combat_data.load_combatants()
+
+    def load_participants(self) -> None:
+        """load participants (after queued writes)"""
+        self.join()
+        self.combat_data.load_participants()
+
+    def load_saving_throws(self) -> None:
+        """load saving throws (after queued writes)"""
+        self.join()
+        self.combat_data.load_saving_throws()
+
+    def run(self) -> None:
+        """writer thread: run queued write operations on its own data connection"""
+        try:
+            combat_data, _, _ = self.combat_data_factory.create_combatdata()
+            # the connection's log buffer is flushed here (by close()), never from the main thread at exit
+            atexit.unregister(combat_data.flush_log_actions)
+        except Exception as error:
+            self.error = error
+            return
+        finally:
+            self.connected.set()
+
+        while True:
+            operation: tuple = self.queue.get()  # None: stop
+            try:
+                if operation is None:
+                    combat_data.close()
+                else:
+                    name, args = operation
+                    getattr(combat_data, name)(*args)
+            except Exception as error:
+                if self.error is None:
+                    self.error = error
+            finally:
+                self.queue.task_done()
+
+            if operation is None:
+                return
+
+    def submit(self, name: str, *args) -> None:
+        """queue write operation (blocks while queue is full)
+
+        args:
+            name: str - CombatData write method name
+            args: method arguments
+        """
+        self.check_errors()
+        self.queue.put((name, args))
@@ -1,12 +1,176 @@
 # combatmodel.py
 
-from lib.dice import Dice
+import bisect
+import heapq
+from itertools import count
+import os
+import pickle
+import zlib
+
+import numpy as np
+
+from lib.combatdata import CombatData
+from lib.combatdatawriter import CombatDataWriter
+from lib.participantrepository import ParticipantRepository
+from lib.dice import Dice, DiceStreams
+from lib.diceexpression import DamagePlan
 import lib.combatdatafactory as cdf1
 import lib.ui as ui1
 
 
+class ParticipantTemplate:
+    """participant database values shared (by reference) by all combatants of a participant"""
+
+    # member variable name: database column name
+    FIELDS = {
+        "abbr": "Abbr",
+        "name": "Name",
+        "charactertype": "CharacterType",
+        "racetype": "RaceType",
+        "classtype": "ClassType",
+        "level": "Level",
+        "savingthrowclasstype": "SavingThrowClassType",
+        "savingthrowlevel": "SavingThrowLevel",
+        "savingthrowlevelpdm": "SavingThrowLevelPDM",
+        "size": "Size",
+        "attacksperround": "AttacksPerRound",
+        "ac": "AC",
+        "thac0": "THAC0",
+        "defensiveadjustment": "DefensiveAdjustment",
+        "missileattack": "MissileAttack",
+        "damageperattack": "DamagePerAttack",
+        "specialattack": "SpecialAttack",
+        "specialdefense": "SpecialDefense",
+        "notes": "Notes",
+        "regenerationroundstart": "RegenerationRoundStart",
+        "regenerationhitpoint": "RegenerationHitPoint",
+        "regenerateafterdamage": "RegenerationAfterDamage",
+    }
+
+    __slots__ = (
+        "values",
+        "damageplan",
+        "hitpointrules",
+        "hitpointstart",
+        "experiencebase",
+        "experiencehitpointmultiplier",
+        "experienceaddhitpoint",
+        *FIELDS,
+    )
+
+    def __init__(self, **kwargs):
+        # Raw participant values
+        self.values: dict = kwargs
+
+        # Assign member variables to database-retrieved values
+        for field, column in self.FIELDS.items():
+            setattr(self, field, kwargs[column])
+
+        # Precompute participant-derived values used to spawn combatants
+        self.damageplan: DamagePlan = DamagePlan.compile(self.damageperattack)
+        self.hitpointrules: tuple = (
+            kwargs["HitDiceTypeCode"],
+            kwargs["HitDie"],
+            kwargs["HitDice"],
+            kwargs["HitDiceMin"],
+            kwargs["HitDiceMax"],
+            kwargs["HitDiceModifier"],
+            kwargs["HitDieValue"],
+            kwargs["HitPointStart"],
+            kwargs["HitPointMin"],
+            kwargs["HitPointMax"],
+        )
+        self.hitpointstart: int = kwargs["HitPointStart"]
+        self.experiencebase: int = kwargs["ExperienceBase"] + kwargs["ExperienceAdjustment"]
+        self.experiencehitpointmultiplier: int = kwargs["ExperienceHitPointMultiplier"]
+        self.experienceaddhitpoint: bool = kwargs["ExperienceAddHitPoint"]
+
+
+class ParticipantValue:
+    """read-only combatant attribute delegated to the combatant's participant template"""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, combatant, owner=None):
+        if combatant is None:
+            return self
+
+        return getattr(combatant.participant, self.name)
+
+
+class CombatantState:
+    """combatant combat state attribute held in the combatant's own slot or,
+    when attached, in its row of a columnar CombatantStore"""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.member = owner.__dict__["_" + name]  # underlying slot
+
+    def __get__(self, combatant, owner=None):
+        if combatant is None:
+            return self
+
+        if combatant.store is None:
+            return self.member.__get__(combatant, owner)
+
+        return int(getattr(combatant.store, self.name)[combatant.row])
+
+    def __set__(self, combatant, value):
+        if combatant.store is None:
+            self.member.__set__(combatant, value)
+        else:
+            getattr(combatant.store, self.name)[combatant.row] = value
+
+
+class CombatantHitPoints(CombatantState):
+    """combatant hit points; tells the owning encounter when the combatant's
+    availability (see Combatant.is_available) changes and that its hit points
+    need persisting (only when they actually change)"""
+
+    def __set__(self, combatant, value):
+        if combatant.encounter is None:
+            super().__set__(combatant, value)
+            return
+
+        if self.__get__(combatant) == value:
+            return
+
+        isavailable: bool = combatant.is_available()
+        super().__set__(combatant, value)
+        if combatant.is_available() != isavailable:
+            combatant.encounter.change_available_count(combatant.combattype, not isavailable)
+
+        combatant.encounter.changed_hitpoints[combatant] = None
+
+
 class Combatant:
-    """defines combatants that are participants with combat settings"""
+    """defines combatants that are participants with combat settings
+
+    Participant (database) values are held once in a shared ParticipantTemplate;
+    only per-combatant combat state is stored (in slots) on each combatant.
+    """
+
+    __slots__ = (
+        "participant",
+        "combattype",
+        "group",
+        "seq",
+        "typeabbrseq",
+        "_initiative",
+        "damage",
+        "_attackmodifier",
+        "_defensemodifier",
+        "_hp",
+        "_hpmax",
+        "xp",
+        "defender_typeabbrseq",
+        "inactivereason",
+        "regenerationround",
+        "store",
+        "row",
+        "encounter",
+    )
 
     TYPE_PLAYER_CHARACTER = "PC"
     TYPE_NON_PLAYER_CHARACTER = "NPC"
@@ -14,6 +178,18 @@ class Combatant:
 
     DUNGEON_MASTER = "AAA_DM"
 
+    HITDICETYPE_DIE_FIXED = "DF"  # Die Fixed
+    HITDICETYPE_DIE_FIXED_POINTS_FIXED = "DFPF"  # Die Fixed Points Fixed
+    HITDICETYPE_DIE_FIXED_POINTS_VARIABLE = "DFPV"  # Die Fixed Points Variable
+    HITDICETYPE_DIE_VARIABLE = "DV"  # Die Variable
+    HITDICETYPE_POINTS_FIXED = "PF"  # Points Fixed
+    HITDICETYPE_POINTS_VARIABLE = "PV"  # Points Variable
+    HITDICETYPE_DIE_FIXED_ALL = [
+        HITDICETYPE_DIE_FIXED,
+        HITDICETYPE_DIE_FIXED_POINTS_FIXED,
+        HITDICETYPE_DIE_FIXED_POINTS_VARIABLE,
+    ]
+
     CLASSTYPE = {
         "MO": "MONSTER",
         "CL": "CLERIC",
@@ -43,6 +219,38 @@ class Combatant:
         "HU": "HUMAN",
     }
 
+    # Participant-derived values (read from shared participant template)
+    abbr = ParticipantValue()
+    name = ParticipantValue()
+    charactertype = ParticipantValue()
+    racetype = ParticipantValue()
+    classtype = ParticipantValue()
+    level = ParticipantValue()
+    savingthrowclasstype = ParticipantValue()
+    savingthrowlevel = ParticipantValue()
+    savingthrowlevelpdm = ParticipantValue()
+    size = ParticipantValue()
+    attacksperround = ParticipantValue()
+    ac = ParticipantValue()
+    thac0 = ParticipantValue()
+    defensiveadjustment = ParticipantValue()
+    missileattack = ParticipantValue()
+    damageperattack = ParticipantValue()
+    damageplan = ParticipantValue()
+    specialattack = ParticipantValue()
+    specialdefense = ParticipantValue()
+    notes = ParticipantValue()
+    regenerationroundstart = ParticipantValue()
+    regenerationhitpoint = ParticipantValue()
+    regenerateafterdamage = ParticipantValue()
+
+    # Combat state (slot or columnar store row)
+    initiative = CombatantState()
+    attackmodifier = CombatantState()
+    defensemodifier = CombatantState()
+    hp = CombatantHitPoints()
+    hpmax = CombatantHitPoints()
+
     def __init__(
         self,
         combattype: str,
@@ -53,34 +261,19 @@ class Combatant:
         damage: int = None,
         attackmodifier: int = None,
         defensemodifier: int = None,
+        dice: type = None,
+        participant: ParticipantTemplate = None,
         **kwargs,
     ):
-        # Load all raw participant values
-        self.load_participant_values(**kwargs)
+        # Share participant template (or load all raw participant values into new one)
+        if participant is None:
+            self.load_participant_values(**kwargs)
+        else:
+            self.participant: ParticipantTemplate = participant
 
-        # Assign member variables to database-retrieved values
-        self.abbr: str = self.Abbr
-        self.name: str = self.Name
-        self.charactertype: str = self.CharacterType
-        self.racetype: str = self.RaceType
-        self.classtype: str = self.ClassType
-        self.level: str = self.Level
-        self.savingthrowclasstype: str = self.SavingThrowClassType
-        self.savingthrowlevel: int = self.SavingThrowLevel
-        self.savingthrowlevelpdm: int = self.SavingThrowLevelPDM
-        self.size: int = self.Size
-        self.attacksperround: str = self.AttacksPerRound
-        self.ac: int = self.AC
-        self.thac0: int = self.THAC0
-        self.defensiveadjustment: int = self.DefensiveAdjustment
-        self.missileattack: int = self.MissileAttack
-        self.damageperattack: int = self.DamagePerAttack
-        self.specialattack: str = self.SpecialAttack
-        self.specialdefense: str = self.SpecialDefense
-        self.notes: str = self.Notes
-        self.regenerationroundstart: int = self.RegenerationRoundStart
-        self.regenerationhitpoint: int = self.RegenerationHitPoint
-        self.regenerateafterdamage: int = self.RegenerationAfterDamage
+        self.store: CombatantStore = None
+        self.row: int = -1
+        self.encounter: Encounter = None  # set while counted by an encounter
 
         # Assign member variables to parameters
         self.combattype: str = combattype
@@ -107,39 +300,39 @@ class Combatant:
         else:
             self.defensemodifier: int = defensemodifier
 
+        participant = self.participant
         if hp == 0:
-            self.hp: int = self.calculate_hitpoints(
-                self.HitDiceTypeCode,
-                self.HitDie,
-                self.HitDice,
-                self.HitDiceMin,
-                self.HitDiceMax,
-                self.HitDiceModifier,
-                self.HitDieValue,
-                self.HitPointStart,
-                self.HitPointMin,
-                self.HitPointMax,
-            )
+            self.hp: int = self.calculate_hitpoints(*participant.hitpointrules, dice)
         else:
             self.hp: int = hp
 
-        if self.HitPointStart == 0:
+        if participant.hitpointstart == 0:
             self.hpmax: int = self.hp
         else:
-            self.hpmax: int = self.HitPointStart
+            self.hpmax: int = participant.hitpointstart
 
-        self.xp: int = (
-            self.ExperienceBase
-            + self.ExperienceAdjustment
-            + (self.hp * self.ExperienceHitPointMultiplier)
+        self.xp: int = participant.experiencebase + (
+            self.hp * participant.experiencehitpointmultiplier
         )
-        if self.ExperienceAddHitPoint:
+        if participant.experienceaddhitpoint:
             self.xp += self.hp
 
         self.defender_typeabbrseq: str = ""
         self.inactivereason: str = ""
         self.regenerationround: int = 0
 
+    def __getattr__(self, name: str):
+        """get raw participant value (i.e. AttacksPerRound) from shared participant template"""
+        if name == "participant":
+            raise AttributeError(name)
+
+        try:
+            return self.participant.values[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
     def calculate_hitpoints(
         self,
         hitdicetypecode: str,
@@ -152,6 +345,7 @@ class Combatant:
         hitpointstart: int,
         hitpointmin: int,
         hitpointmax: int,
+        dice: type = None,
     ) -> int:
         """calculate hit points based on variable hit point rules
 
@@ -166,47 +360,40 @@ class Combatant:
             hitpointstart: int
             hitpointmin: int
             hitpointmax: int
+            dice: type - Dice class (stream) to roll with
         returns:
             hitpoints: int
         """
-        DIE_FIXED = "DF"  # Die Fixed
-        DIE_FIXED_POINTS_FIXED = "DFPF"  # Die Fixed Points Fixed
-        DIE_FIXED_POINTS_VARIABLE = "DFPV"  # Die Fixed Points Variable
-        DIE_VARIABLE = "DV"  # Die Variable
-        POINTS_FIXED = "PF"  # Points Fixed
-        POINTS_VARIABLE = "PV"  # Points Variable
+        if dice is None:
+            dice = Dice
 
         hitpoints: int = -999
         variablehitpointrange: int = hitpointmax - hitpointmin + 1
 
         # Process hit point fixed die values
-        if hitdicetypecode in [
-            DIE_FIXED,
-            DIE_FIXED_POINTS_FIXED,
-            DIE_FIXED_POINTS_VARIABLE,
-        ]:
+        if hitdicetypecode in self.HITDICETYPE_DIE_FIXED_ALL:
             if hitdievalue == 0:
-                hitpoints: int = Dice.roll_dice(hitdice, hitdie, hitdicemodifier, 0)
+                hitpoints: int = dice.roll_dice(hitdice, hitdie, hitdicemodifier, 0)
             else:
                 hitpoints: int = hitdice * hitdievalue
 
-            if hitdicetypecode == DIE_FIXED_POINTS_FIXED:
+            if hitdicetypecode == self.HITDICETYPE_DIE_FIXED_POINTS_FIXED:
                 hitpoints: int = hitpoints + hitpointstart
 
-            if hitdicetypecode == DIE_FIXED_POINTS_VARIABLE:
+            if hitdicetypecode == self.HITDICETYPE_DIE_FIXED_POINTS_VARIABLE:
                 hitpoints: int = (
-                    hitpoints + hitpointmin + Dice.roll_die(variablehitpointrange, 0)
+                    hitpoints + hitpointmin + dice.roll_die(variablehitpointrange, 0)
                 )
 
             return hitpoints
 
         # Process hit point variable die values
-        if hitdicetypecode == DIE_VARIABLE:
-            variablehitdicerange: int = (hitdicemin - 1) + Dice.roll_die(
+        if hitdicetypecode == self.HITDICETYPE_DIE_VARIABLE:
+            variablehitdicerange: int = (hitdicemin - 1) + dice.roll_die(
                 hitdicemax - hitdicemin + 1
             )
             if hitdievalue == 0:
-                hitpoints: int = Dice.roll_dice(
+                hitpoints: int = dice.roll_dice(
                     variablehitdicerange, hitdie, hitdicemodifier, 0
                 )
             else:
@@ -215,13 +402,81 @@ class Combatant:
             return hitpoints
 
         # Process hit point fixed point values
-        if hitdicetypecode == POINTS_FIXED:
+        if hitdicetypecode == self.HITDICETYPE_POINTS_FIXED:
             hitpoints: int = hitpointstart
             return hitpoints
 
         # Process hit point variable point values
-        if hitdicetypecode == POINTS_VARIABLE:
-            hitpoints: int = hitpointmin + Dice.roll_die(variablehitpointrange, 0)
+        if hitdicetypecode == self.HITDICETYPE_POINTS_VARIABLE:
+            hitpoints: int = hitpointmin + dice.roll_die(variablehitpointrange, 0)
+
+        return hitpoints
+
+    @classmethod
+    def calculate_group_hitpoints(
+        cls, participant: ParticipantTemplate, count: int, dice: type = None
+    ) -> np.ndarray:
+        """calculate hit points of many combatants of the same participant at once
+        (same distribution per hit dice type code as calculate_hitpoints)
+
+        args:
+            participant: ParticipantTemplate
+            count: int - number of combatants
+            dice: type - Dice class (stream) to roll with
+        returns:
+            np.ndarray: hit points of each combatant
+        """
+        if dice is None:
+            dice = Dice
+
+        (
+            hitdicetypecode,
+            hitdie,
+            hitdice,
+            hitdicemin,
+            hitdicemax,
+            hitdicemodifier,
+            hitdievalue,
+            hitpointstart,
+            hitpointmin,
+            hitpointmax,
+        ) = participant.hitpointrules
+
+        hitpoints: np.ndarray = np.full(count, -999, dtype=np.int64)
+        variablehitpointrange: int = hitpointmax - hitpointmin + 1
+
+        # Process hit point fixed die values
+        if hitdicetypecode in cls.HITDICETYPE_DIE_FIXED_ALL:
+            if hitdievalue == 0:
+                hitpoints = dice.roll_many(hitdice, hitdie, count, hitdicemodifier, 0)
+            else:
+                hitpoints = np.full(count, hitdice * hitdievalue, dtype=np.int64)
+
+            if hitdicetypecode == cls.HITDICETYPE_DIE_FIXED_POINTS_FIXED:
+                hitpoints += hitpointstart
+
+            if hitdicetypecode == cls.HITDICETYPE_DIE_FIXED_POINTS_VARIABLE:
+                hitpoints += hitpointmin + dice.roll_many(variablehitpointrange, 1, count)
+
+            return hitpoints
+
+        # Process hit point variable die values (die sides vary per combatant)
+        if hitdicetypecode == cls.HITDICETYPE_DIE_VARIABLE:
+            variablehitdicerange: np.ndarray = (hitdicemin - 1) + dice.roll_many(
+                hitdicemax - hitdicemin + 1, 1, count
+            )
+            if hitdievalue == 0:
+                return dice.roll_many(variablehitdicerange, hitdie, count, hitdicemodifier, 0)
+
+            return variablehitdicerange * hitdievalue
+
+        # Process hit point fixed point values
+        if hitdicetypecode == cls.HITDICETYPE_POINTS_FIXED:
+            return np.full(count, hitpointstart, dtype=np.int64)
+
+        # Process hit point variable point values
+        if hitdicetypecode == cls.HITDICETYPE_POINTS_VARIABLE:
+            hitpoints = hitpointmin + dice.roll_many(variablehitpointrange, 1, count)
 
         return hitpoints
 
@@ -402,6 +657,20 @@ class Combatant:
         """
         return not self.is_dead()
 
+    def is_available(self) -> bool:
+        """check if combatant counts as available (friends that can attack, foes that are alive)
+
+        returns:
+            bool: True if combatant is available, False otherwise
+        """
+        if self.is_dungeon_master():
+            return False
+
+        if self.combattype == Encounter.COMBATTYPE_FRIEND:
+            return self.can_attack()
+
+        return self.is_alive()
+
     def is_dead(self) -> bool:
         """check if combatant is dead
 
@@ -451,7 +720,7 @@ class Combatant:
         returns:
             bool: True if combatant could be a spell caster, False otherwise
         """
-        for classtype in self.ClassType.split(","):
+        for classtype in self.classtype.split(","):
             if classtype in self.CLASSTYPE_SPELLCASTER:
                 return True
 
@@ -466,13 +735,12 @@ class Combatant:
         return -10 < self.hp <= 0
 
     def load_participant_values(self, **kwargs) -> None:
-        """load participant key-valued pairs into member variables
+        """load participant key-valued pairs into participant template
 
         args:
             kwargs: dict of participant key-valued pairs
         """
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        self.participant: ParticipantTemplate = ParticipantTemplate(**kwargs)
 
     def regenerate_hitpoints(self) -> None:
         """regenerate combatant hit points"""
@@ -510,6 +778,246 @@ class Combatant:
             return False
 
 
+class CombatantStore:
+    """columnar (struct-of-arrays) store of combatant combat state for large encounters
+
+    Attached combatants become views over their row: reading or writing hp, hpmax,
+    initiative, attackmodifier or defensemodifier goes to the store's arrays, so bulk
+    questions (available combatants, group damage) are vectorized operations.
+    """
+
+    COLUMNS = ["hp", "hpmax", "initiative", "attackmodifier", "defensemodifier"]
+
+    def __init__(self, combatants: list, foe_combattype: str):
+        self.combatants: list = list(combatants)
+
+        # participant-derived (static) columns
+        self.ac: np.ndarray = np.array([c.ac for c in self.combatants], dtype=np.int64)
+        self.thac0: np.ndarray = np.array([c.thac0 for c in self.combatants], dtype=np.int64)
+        self.isfoe: np.ndarray = np.array(
+            [c.combattype == foe_combattype for c in self.combatants], dtype=bool
+        )
+        self.ismonster: np.ndarray = np.array([c.is_monster() for c in self.combatants], dtype=bool)
+        self.isdungeonmaster: np.ndarray = np.array(
+            [c.is_dungeon_master() for c in self.combatants], dtype=bool
+        )
+        self.ismissileattack: np.ndarray = np.array(
+            [bool(c.missileattack) for c in self.combatants], dtype=bool
+        )
+
+        # combat state columns
+        for column in self.COLUMNS:
+            setattr(
+                self,
+                column,
+                np.array([getattr(c, column) for c in self.combatants], dtype=np.int64),
+            )
+
+        for row, combatant in enumerate(self.combatants):
+            combatant.store = self
+            combatant.row = row
+
+    def __len__(self) -> int:
+        return len(self.combatants)
+
+    def alive(self) -> np.ndarray:
+        """alive mask (monsters die at 0 hit points, others at -10)"""
+        return np.where(self.ismonster, self.hp > 0, self.hp > -10)
+
+    def can_attack(self) -> np.ndarray:
+        """can attack mask"""
+        return self.hp > 0
+
+    def available(self) -> np.ndarray:
+        """available mask (friends that can attack or foes that are alive)"""
+        return np.where(self.isfoe, self.alive(), self.can_attack()) & ~self.isdungeonmaster
+
+    def detach(self) -> None:
+        """copy combat state back into combatants and release them from the store"""
+        for row, combatant in enumerate(self.combatants):
+            combatant.store = None
+            for column in self.COLUMNS:
+                # write underlying slot (value is unchanged, so no availability change)
+                setattr(combatant, "_" + column, int(getattr(self, column)[row]))
+
+            combatant.row = -1
+
+    def take_damage(self, rows, damage) -> None:
+        """record damage taken by many combatants at once
+
+        args:
+            rows: array-like - store rows of damaged combatants
+            damage: int | array-like - damage per combatant
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self.hp[rows] = np.minimum(self.hp[rows] - damage, self.hpmax[rows])
+
+
+class InitiativeScheduler:
+    """priority queue of eligible attackers keyed on initiative (highest first)
+
+    Melee rounds draw from every combatant; missile rounds draw from missile attackers
+    plus inactive combatants (who always get a chance to respond). Entries are removed
+    lazily: passed, dead or rescheduled entries are discarded when they reach the top,
+    so finding the next attacker costs O(log n) instead of a walk of the combatant list.
+    """
+
+    def __init__(self, initiative_active_minimum: int):
+        self.initiative_active_minimum: int = initiative_active_minimum
+        self.views: dict = {True: [], False: []}  # ismissileattack: heap
+        self.versions: dict = {}  # Combatant: latest entry version
+        self.order = count()
+        self.initiative: int = None  # lowest initiative scheduled for (None: rebuild)
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def build(self, combatants: list, initiative: int) -> None:
+        """schedule combatants for attacks at or below initiative
+
+        args:
+            combatants: list of Combatant objects (list order breaks initiative ties)
+            initiative: int - current encounter initiative
+        """
+        self.views = {True: [], False: []}
+        self.versions = {}
+        self.order = count()
+        for combatant in combatants:
+            self.versions[combatant] = 0
+            for ismissileattack, view in self.views.items():
+                if self.is_eligible(combatant, ismissileattack):
+                    view.append((-combatant.initiative, next(self.order), 0, combatant))
+
+        for view in self.views.values():
+            heapq.heapify(view)
+
+        self.initiative = initiative
+
+    def clear(self) -> None:
+        """force rebuild on next find_next_attacker"""
+        self.initiative = None
+
+    def find_next_attacker(self, combatants: list, initiative: int, ismissileattack: bool) -> Combatant:
+        """find next available attacker (highest initiative not above current)
+
+        The attacker is left scheduled until the encounter initiative moves below it,
+        so an attacker attacking again is found again.
+
+        args:
+            combatants: list of Combatant objects (used when rebuilding)
+            initiative: int - current encounter initiative
+            ismissileattack: bool - current round is missile round
+        returns:
+            Combatant: attacker combatant object (None if no attacker remains)
+        """
+        # encounter initiative moved up (new round or manual set): passed entries are eligible again
+        if self.initiative is None or initiative > self.initiative:
+            self.build(combatants, initiative)
+
+        self.initiative = initiative
+        view: list = self.views[ismissileattack]
+        while view:
+            entryinitiative, _, version, combatant = view[0]
+            entryinitiative = -entryinitiative
+            if entryinitiative > initiative or self.versions.get(combatant) != version:
+                heapq.heappop(view)
+                continue
+
+            # initiative changed without reschedule: requeue at current initiative
+            if combatant.initiative != entryinitiative:
+                heapq.heappop(view)
+                self.reschedule(combatant)
+                continue
+
+            if not combatant.can_attack():
+                heapq.heappop(view)
+                continue
+
+            return combatant
+
+        return None
+
+    def is_eligible(self, combatant: Combatant, ismissileattack: bool) -> bool:
+        """check if combatant belongs in missile or melee view"""
+        if not ismissileattack:
+            return True
+
+        return combatant.missileattack or combatant.initiative < self.initiative_active_minimum
+
+    def remove(self, combatant: Combatant) -> None:
+        """unschedule combatant (i.e. deleted from encounter)"""
+        self.versions.pop(combatant, None)
+
+    def reschedule(self, combatant: Combatant) -> None:
+        """requeue combatant at its current initiative (i.e. initiative changed mid-round)"""
+        version: int = self.versions.get(combatant, -1) + 1
+        self.versions[combatant] = version
+        for ismissileattack, view in self.views.items():
+            if self.is_eligible(combatant, ismissileattack):
+                heapq.heappush(view, (-combatant.initiative, next(self.order), version, combatant))
+
+
+class RegenerationScheduler:
+    """regenerative combatants (non-zero regeneration hit points), checked each round
+
+    Only combatants that can regenerate are tracked, so a round's regeneration does not
+    visit the whole combatant list. A damaged combatant counts rounds since it was last
+    at full hit points and is due once it reaches RegenerationRoundStart (immediately
+    when there is no start round and it need not wait for damage).
+    """
+
+    def __init__(self):
+        self.combatants: dict = {}  # Combatant: None (insertion-ordered set)
+
+    def __len__(self) -> int:
+        return len(self.combatants)
+
+    def add(self, combatant: Combatant) -> None:
+        """track combatant if it can regenerate"""
+        if combatant.regenerationhitpoint != 0:
+            self.combatants[combatant] = None
+
+    def clear(self) -> None:
+        """stop tracking all combatants"""
+        self.combatants = {}
+
+    def get_due_combatants(self) -> list:
+        """advance one round and get combatants due to regenerate
+
+        returns:
+            list: Combatant objects
+        """
+        due: list = []
+        for combatant in self.combatants:
+            # no damage
+            if combatant.hp == combatant.hpmax:
+                combatant.regenerationround = 0
+                continue
+
+            combatant.regenerationround += 1
+            if self.is_due(combatant):
+                due.append(combatant)
+
+        return due
+
+    @staticmethod
+    def is_due(combatant: Combatant) -> bool:
+        """check if damaged combatant is due to regenerate
+
+        returns:
+            bool: True if combatant regenerates this round, False otherwise
+        """
+        # (no regeneration starting round and can regenerate without waiting) or (regeneration round reached regeneration round start)
+        if combatant.regenerationroundstart == 0:
+            return combatant.regenerateafterdamage == False
+
+        return combatant.regenerationround >= combatant.regenerationroundstart
+
+    def remove(self, combatant: Combatant) -> None:
+        """stop tracking combatant"""
+        self.combatants.pop(combatant, None)
+
+
 class Encounter:
     """Encounter container for tracking all combatant attacks by round"""
 
@@ -518,6 +1026,10 @@ class Encounter:
     ATTACK_CRITICAL_HIT = 20
     COMBATTYPE_FRIEND = "FRIEND"
     COMBATTYPE_FOE = "FOE"
+    COMBATANTS_COLUMNAR_MINIMUM = 100  # use columnar combatant store at or above this many combatants
+    HITPOINTS_PERSIST_ATTACK = 1  # changed hit points persisted after every attack
+    HITPOINTS_PERSIST_ROUND = 2  # ... at round end
+    HITPOINTS_PERSIST_ENCOUNTER = 3  # ... at encounter end
     # CONFIG_FILE                  = r'C:\users\jkraxberger\pyproj\github\mm\config.ini'
     INITIATIVE_DIE_MAJOR = 6
     INITIATIVE_DIE_MINOR = 999
@@ -528,31 +1040,100 @@ class Encounter:
     INITIATIVE_NONE = -1
     INITIATIVE_MINIMUM = INITIATIVE_INACTIVE_MINIMUM
     INITIATIVE_MAXIMUM = INITIATIVE_ACTIVE_MAXIMUM
+    SNAPSHOT_VERSION = 2
+    SNAPSHOT_STATE = [  # in-memory combatant state saved in snapshots (hit points live in the database)
+        "group",
+        "initiative",
+        "damage",
+        "attackmodifier",
+        "defensemodifier",
+        "xp",
+        "defender_typeabbrseq",
+        "inactivereason",
+        "regenerationround",
+    ]
     TO_HIT_DIE = 20
     TO_HIT_DIE_MINIMUM = 1
     TO_HIT_DIE_MAXIMUM = 30
 
-    # Attributes
-    friend_count: int = 0
-    foe_count: int = 0
-    combatant_attack_number: int = 1
-    combatants: list = []
+    def __init__(
+        self,
+        seed: int = None,
+        buffered_dice: bool = False,
+        combat_data: CombatData = None,
+        checkpoint_file: str = None,
+        background_writes: bool = False,
+        hitpoints_persist: int = None,
+    ) -> None:
+        """create encounter session (all combat state is per instance)
 
-    # def __init__(self, combat_data) -> None:
-    def __init__(self) -> None:
+        args:
+            seed: int - dice stream seed (None for fresh entropy)
+            buffered_dice: bool - serve single dice rolls from pre-drawn blocks
+            combat_data: CombatData - data connection to use (default: new one from CombatDataFactory)
+            checkpoint_file: str - snapshot file written at every round boundary (None: no checkpoints)
+            background_writes: bool - persist log rows and hit points on a writer thread
+                (see CombatDataWriter: writes use a second connection)
+            hitpoints_persist: int - HITPOINTS_PERSIST_* boundary at which changed hit points
+                are written (default: HITPOINTS_PERSIST_ATTACK)
+        """
         self.encounter: int = 1
         self.round: int = 1
+        self.combatants: list = []
+        self.friend_count: int = 0
+        self.foe_count: int = 0
+        self.combatant_attack_number: int = 1
         self.initiative: int = self.INITIATIVE_ACTIVE_MAXIMUM
         self.ismissileattack: bool = True
-        combat_data_factory = cdf1.CombatDataFactory()
-        self.combat_data, self.database_type, self.database_connector = (
-            combat_data_factory.create_combatdata()
-        )
-        ui1.UI.output(
-            f"Database '{self.database_type}' method '{self.database_connector}'"
+        self.store: CombatantStore = None
+        self.combatant_index: dict = {}  # typeabbrseq: Combatant
+        self.group_index: dict = {}  # group: set of Combatant
+        self.scheduler = InitiativeScheduler(self.INITIATIVE_ACTIVE_MINIMUM)
+        self.available_counts: dict = {self.COMBATTYPE_FRIEND: 0, self.COMBATTYPE_FOE: 0}
+        self.regeneration = RegenerationScheduler()
+        self.participant_templates: dict = {}
+        self.checkpoint_file: str = checkpoint_file
+        self.changed_hitpoints: dict = {}  # Combatant: None (ordered set) with unpersisted hp/hpmax
+        self.hitpoints_persist: int = (
+            self.HITPOINTS_PERSIST_ATTACK if hitpoints_persist is None else hitpoints_persist
         )
+
+        # independent dice stream (spawn more from dice_streams for parallel simulations)
+        self.dice_streams: DiceStreams = DiceStreams(seed)
+        self.dice: type = self.dice_streams.spawn_dice()
+        if buffered_dice:
+            # serve single rolls from pre-drawn blocks (headless auto-play)
+            self.dice = self.dice.buffered()
+
+        if combat_data is None:
+            combat_data_factory = cdf1.CombatDataFactory()
+            self.combat_data, self.database_type, self.database_connector = (
+                combat_data_factory.create_combatdata()
+            )
+            ui1.UI.output(
+                f"Database '{self.database_type}' method '{self.database_connector}'"
+            )
+        else:
+            # injected (i.e. pooled by a SessionManager) data connection
+            self.combat_data: CombatData = combat_data
+            self.database_type: str = None
+            self.database_connector: str = None
+
+        if background_writes:
+            self.combat_data = CombatDataWriter(self.combat_data)
+
+        # participants used by combatants (fetched on demand, independent of the full catalog load)
+        self.participant_repository = ParticipantRepository(self.combat_data)
         self.load_saving_throws()
 
+    def attach_store(self) -> None:
+        """attach combatants to a columnar combatant store (large encounters only)"""
+        if len(self.combatants) >= self.COMBATANTS_COLUMNAR_MINIMUM:
+            self.store = CombatantStore(self.combatants, self.COMBATTYPE_FOE)
+        elif self.store is not None:
+            self.store.detach()
+            self.store = None
+
     def calculate_earned_xp(
         self, originalhp: int, hp: int, damage: int, xp: int
     ) -> int:
@@ -574,42 +1155,68 @@ class Encounter:
         returnvalue = int((value / originalhp) * xp)
         return returnvalue
 
-    def check_duplicate_initiative(self) -> None:
-        """check for duplicate initiative and adjust if necessary"""
-        self.sort_combatants_by_initiative()
+    def check_duplicate_initiative(self, combatant: Combatant = None) -> None:
+        """check for duplicate initiative and adjust if necessary
+
+        Duplicates are bumped up to the next free initiative; on ties the combatant
+        earlier in the (initiative sorted) list keeps its value.
 
-        # Detect duplicate initiative and esequence
-        initiative = set()
-        for i in range(len(self.combatants)):
-            while self.combatants[i].initiative in initiative:
-                self.combatants[i].initiative += 1
+        args:
+            combatant: Combatant - only this combatant's initiative changed (default: check all)
+        """
+        if combatant is not None:
+            self.check_combatant_initiative(combatant)
+            return
 
-            initiative.add(self.combatants[i].initiative)
+        # next free initiative at or above a taken one (path-compressed chains)
+        nextfree: dict = {}
+        bumped: list = []
+        for combatant in self.combatants:
+            initiative: int = combatant.initiative
+            free: int = initiative
+            while free in nextfree:
+                free = nextfree[free]
 
-        self.sort_combatants_by_initiative()
+            while initiative != free:
+                nextfree[initiative], initiative = free, nextfree[initiative]
+
+            nextfree[free] = free + 1
+            if combatant.initiative != free:
+                bumped.append((combatant, free))
+
+        for combatant, initiative in bumped:
+            self.set_combatant_initiative(combatant, initiative)
+
+    def check_combatant_initiative(self, combatant: Combatant) -> None:
+        """resolve one combatant's changed initiative without re-sorting combatant list
+
+        args:
+            combatant: Combatant - combatant whose initiative changed
+        """
+        initiative: int = combatant.initiative
+        while self.is_initiative_taken(initiative, combatant):
+            initiative += 1
+
+        self.set_combatant_initiative(combatant, initiative)
+
+    def change_available_count(self, combattype: str, isavailable: bool) -> None:
+        """record combatant becoming available (True) or unavailable (False)
+
+        args:
+            combattype: str
+            isavailable: bool
+        """
+        self.available_counts[combattype] += 1 if isavailable else -1
 
     def count_combatants(self, combattype: str) -> int:
-        """count number of available combatants
+        """count number of available combatants (maintained as hit points change)
 
         args:
             combattype: str
         returns:
             int: number of available combatants
         """
-        combatant_count: int = 0
-        for combatant in self.combatants:
-            if combatant.abbr == Combatant.DUNGEON_MASTER:
-                continue
-
-            if combatant.combattype == combattype:
-                if combatant.combattype == self.COMBATTYPE_FRIEND:
-                    if combatant.can_attack():
-                        combatant_count += 1
-                else:
-                    if combatant.is_alive():
-                        combatant_count += 1
-
-        return combatant_count
+        return self.available_counts.get(combattype, 0)
 
     def count_available_combatants(self) -> None:
         """count available combatants"""
@@ -618,10 +1225,47 @@ class Encounter:
 
     def delete_dead_oponents(self) -> None:
         """delete dead opponents from database and active combat list"""
+        self.persist_hit_points()  # database must know who is dead
         self.combat_data.delete_dead_foes()
-        for combatant in self.combatants:
-            if combatant.combattype == self.COMBATTYPE_FOE and combatant.is_dead():
-                self.combatants.remove(combatant)
+        deadcombatants: list = [
+            combatant
+            for combatant in self.combatants
+            if combatant.combattype == self.COMBATTYPE_FOE and combatant.is_dead()
+        ]
+        for combatant in deadcombatants:
+            combatant.encounter = None
+            self.combatants.remove(combatant)
+            del self.combatant_index[combatant.typeabbrseq]
+            self.unindex_combatant_groups(combatant)
+            self.scheduler.remove(combatant)
+            self.regeneration.remove(combatant)
+
+        if self.store is not None:
+            self.attach_store()
+
+    def damage_combatants(self, combatants: list, damage: int) -> None:
+        """record same damage taken by many combatants (i.e. area of effect)
+
+        args:
+            combatants: list of Combatant objects
+            damage: int
+        """
+        if self.store is not None:
+            rows: np.ndarray = np.array([combatant.row for combatant in combatants], dtype=np.int64)
+            wasavailable: np.ndarray = self.store.available()[rows]
+            self.store.take_damage(rows, damage)
+            isavailable: np.ndarray = self.store.available()[rows]
+            isfoe: np.ndarray = self.store.isfoe[rows]
+            for combattype, mask in [(self.COMBATTYPE_FOE, isfoe), (self.COMBATTYPE_FRIEND, ~isfoe)]:
+                self.available_counts[combattype] += int(
+                    np.count_nonzero(isavailable & mask) - np.count_nonzero(wasavailable & mask)
+                )
+
+            self.changed_hitpoints.update(dict.fromkeys(combatants))
+            return
+
+        for combatant in combatants:
+            combatant.take_damage(damage)
 
     def find_combatant(self, typeabbrseq) -> Combatant:
         """find combatant using abbrseq key
@@ -629,13 +1273,20 @@ class Encounter:
         args:
             typeabbrseq: str
         returns:
-            Combatant: combatant object
+            Combatant: combatant object (None if not found)
         """
-        for combatant in self.combatants:
-            if combatant.typeabbrseq == typeabbrseq:
-                return Combatant
+        return self.combatant_index.get(typeabbrseq)
 
-        return None
+    def find_group_combatants(self, groups: list) -> set:
+        """find live combatants belonging to any of the groups
+
+        args:
+            groups: list of group names
+        returns:
+            set: Combatant objects
+        """
+        members: set = set().union(*(self.group_index.get(group, ()) for group in groups))
+        return {combatant for combatant in members if combatant.is_alive()}
 
     def find_next_attacker(self) -> Combatant:
         """find next available attacker
@@ -643,30 +1294,14 @@ class Encounter:
         returns:
             Combatant: attacker combatant object
         """
-        for attacker in self.combatants:
-            # Exclude if attacker's initiative > event's
-            if attacker.initiative > self.initiative:
-                continue
-
-            # Exclude dead attackers or unconscious attackers
-            elif attacker.can_attack() == False:
-                continue
-
-            # inactive attackers
-            # even though they are unable to attack (due to choice, wounded, healing, spell-prep, retreating, etc.)
-            # they still should be have a chance to respond and possibly change their initiative and/or inactivereason
-            elif attacker.initiative < self.INITIATIVE_ACTIVE_MINIMUM:
-                return attacker
-
-            elif self.ismissileattack:
-                if attacker.missileattack == False:
-                    continue
-
+        attacker = self.scheduler.find_next_attacker(
+            self.combatants, self.initiative, self.ismissileattack
+        )
+        if attacker is not None and not attacker.is_inactive():
             # set event initiative to attacker's
             self.initiative: int = attacker.initiative
 
-            # return attacker
-            return attacker
+        return attacker
 
     def format_attack_type(self) -> str:
         """format attack type
@@ -721,20 +1356,43 @@ class Encounter:
         """get combatants from participant database"""
         self.combat_data.load_combatants()
         combatantdata: dict = self.combat_data.combatants
+        self.participant_repository.prefetch(
+            combatantdata[combatant].get("Abbr") for combatant in combatantdata
+        )
+
+        # roll hit points of new (no hit points yet) combatants in one batch per participant
+        newcombatantcounts: dict = {}
+        for combatant in combatantdata:
+            if combatantdata[combatant].get("hp") == 0:
+                abbr: str = combatantdata[combatant].get("Abbr")
+                newcombatantcounts[abbr] = newcombatantcounts.get(abbr, 0) + 1
+
+        newcombatanthitpoints: dict = {
+            abbr: iter(
+                Combatant.calculate_group_hitpoints(
+                    self.get_participant_template(abbr), count, self.dice
+                ).tolist()
+            )
+            for abbr, count in newcombatantcounts.items()
+        }
+
         combatants = []
         for combatant in combatantdata:
             abbr: str = combatantdata[combatant].get("Abbr")
-            participant: str = self.combat_data.participants.get(abbr)
+            participant: ParticipantTemplate = self.get_participant_template(abbr)
             combattype: str = combatantdata[combatant].get("CombatType")
             combatgroup: str = combatantdata[combatant].get("group")
             combatsequence: int = combatantdata[combatant].get("seq")
             combathitpoints: int = combatantdata[combatant].get("hp")
+            if combathitpoints == 0:
+                combathitpoints = next(newcombatanthitpoints[abbr])
+
             combatattackmodifier: int = combatantdata[combatant].get("attackmodifier")
             combatdefensemodifier: int = combatantdata[combatant].get("defensemodifier")
             combatinitiative: int = 0
             combatdamage: int = 0
 
-            # instantiate new combatant
+            # instantiate new combatant (FOE's new or changed hit points are persisted by load_combatants)
             preparedcombatant = Combatant(
                 combattype,
                 combatgroup,
@@ -744,14 +1402,81 @@ class Encounter:
                 combatdamage,
                 combatattackmodifier,
                 combatdefensemodifier,
-                **participant,
+                self.dice,
+                participant,
             )
 
+            if combattype == self.COMBATTYPE_FOE and (
+                preparedcombatant.hpmax != combatantdata[combatant].get("hpmax")
+                or preparedcombatant.hp != combatantdata[combatant].get("hp")
+            ):
+                self.changed_hitpoints[preparedcombatant] = None
+
             # append combatant to combatants list
             combatants.append(preparedcombatant)
 
         return combatants
 
+    def get_participant_template(self, abbr: str) -> ParticipantTemplate:
+        """get (cached) participant template shared by all combatants of participant
+
+        args:
+            abbr: str
+        returns:
+            ParticipantTemplate: participant template
+        """
+        try:
+            return self.participant_templates[abbr]
+        except KeyError:
+            participant = ParticipantTemplate(**self.participant_repository[abbr])
+            self.participant_templates[abbr] = participant
+            return participant
+
+    def get_initiative_positions(self, initiative: int) -> tuple:
+        """get (start, end) slice of combatant list holding initiative
+
+        args:
+            initiative: int
+        returns:
+            tuple: (start, end) positions
+        """
+        return (
+            bisect.bisect_left(self.combatants, -initiative, key=self.initiative_order),
+            bisect.bisect_right(self.combatants, -initiative, key=self.initiative_order),
+        )
+
+    def get_regeneration_action(self, combatant: Combatant, damage: int, notes: str) -> tuple:
+        """get log_action arguments of a regeneration
+
+        args:
+            combatant: Combatant object
+            damage: int - hit points regenerated (logged as defender damage)
+            notes: str
+        returns:
+            tuple: log_action arguments
+        """
+        return (
+            self.encounter,
+            self.round,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            combatant.combattype,
+            combatant.abbr,
+            combatant.seq,
+            combatant.group,
+            combatant.initiative,
+            combatant.hpmax,
+            combatant.hp,
+            damage,
+            0,
+            0,
+            notes,
+        )
+
     def get_saving_throw(
         self,
         savingthrowclasstype: str,
@@ -769,19 +1494,62 @@ class Encounter:
         returns:
             int: saving throw value
         """
-        savingthrowvalue: int = 0
-        for savingthrow in self.savingthrows:
-            if savingthrow.classtype == savingthrowclasstype:
-                if attacktype in Saving_Throw.SAVING_THROW_POISON_DEATH_MAGIC:
-                    if savingthrow.level == savingthrowlevelpdm:
-                        savingthrowvalue = savingthrow.detail[attacktype]
-                        break
+        return self.savingthrowtable.get_saving_throw(
+            savingthrowclasstype, savingthrowlevel, savingthrowlevelpdm, attacktype
+        )
+
+    def get_saving_throws(self, defenders: list, attacktype: str) -> np.ndarray:
+        """get saving throw values of many defenders (i.e. area of effect)
+
+        args:
+            defenders: list of Combatant objects
+            attacktype: str
+        returns:
+            np.ndarray: saving throw value per defender
+        """
+        return self.savingthrowtable.get_saving_throws(
+            [defender.savingthrowclasstype for defender in defenders],
+            [defender.savingthrowlevel for defender in defenders],
+            [defender.savingthrowlevelpdm for defender in defenders],
+            attacktype,
+        )
 
-                if savingthrow.level == savingthrowlevel:
-                    savingthrowvalue = savingthrow.detail[attacktype]
-                    break
+    @staticmethod
+    def initiative_order(combatant: Combatant) -> int:
+        """combatant list sort key (highest initiative first)"""
+        return -combatant.initiative
+
+    def index_combatant_groups(self, combatant: Combatant) -> None:
+        """add combatant to each of its (comma-delimited) groups' members"""
+        for group in combatant.group.split(","):
+            self.group_index.setdefault(group, set()).add(combatant)
+
+    def index_combatants(self) -> None:
+        """rebuild typeabbrseq and group indexes and available counts of active combatant list"""
+        self.combatant_index = {
+            combatant.typeabbrseq: combatant for combatant in self.combatants
+        }
+        self.group_index = {}
+        self.available_counts = {self.COMBATTYPE_FRIEND: 0, self.COMBATTYPE_FOE: 0}
+        self.regeneration.clear()
+        for combatant in self.combatants:
+            self.index_combatant_groups(combatant)
+            self.regeneration.add(combatant)
+            combatant.encounter = self
+            if combatant.is_available():
+                self.change_available_count(combatant.combattype, True)
+
+    def is_initiative_taken(self, initiative: int, combatant: Combatant = None) -> bool:
+        """check if another combatant has initiative
 
-        return savingthrowvalue
+        args:
+            initiative: int
+            combatant: Combatant - combatant to ignore
+        returns:
+            bool: True if initiative is taken, False otherwise
+        """
+        low, high = self.get_initiative_positions(initiative)
+        return any(other is not combatant for other in self.combatants[low:high])
 
     def is_combatant(self, typeabbrseq: str) -> bool:
         """check if passed typeabbrseq key is in the active combatant list
@@ -791,11 +1559,7 @@ class Encounter:
         returns:
             bool: True if typeabbrseq key is in the active combatant list, False otherwise
         """
-        for combatant in self.combatants:
-            if combatant.typeabbrseq == typeabbrseq:
-                return True
-
-        return False
+        return typeabbrseq in self.combatant_index
 
     def load_combatants(self) -> None:
         """load combatant information"""
@@ -805,19 +1569,14 @@ class Encounter:
                 for combatant in self.combatants
             }
 
+        self.persist_hit_points()  # database must hold current hit points before reload
         self.combatants = self.get_combatants()
+        self.persist_hit_points()  # FOE hit points changed by loading
+        self.index_combatants()
+        self.scheduler.clear()
+        self.attach_store()
         if self.combatants:
             for combatant in self.combatants:
-                # update FOE combatants hit points
-                if combatant.combattype == self.COMBATTYPE_FOE:
-                    self.combat_data.update_combatant_hit_points(
-                        combatant.combattype,
-                        combatant.abbr,
-                        combatant.seq,
-                        combatant.hpmax,
-                        combatant.hp,
-                    )
-
                 # save combatant initiative (if exists)
                 try:
                     saved_initiative: int = combatant_saved_initiative[
@@ -829,6 +1588,7 @@ class Encounter:
                     # combatant does not exist
                     pass
 
+            self.sort_combatants_by_initiative()
             ui1.UI.output(self.format_encounter())
             ui1.UI.output(self.format_combatants())
 
@@ -837,6 +1597,8 @@ class Encounter:
     def load_participants(self) -> None:
         """load participant information"""
         self.combat_data.load_participants()
+        self.participant_templates = {}
+        self.participant_repository.clear()
         ui1.UI.output(f"\nParticipants loaded: {len(self.combat_data.participants)}")
 
     def load_saving_throws(self) -> None:
@@ -859,8 +1621,28 @@ class Encounter:
             # append saving throw to saving throw list
             self.savingthrows.append(preparedsavingthrows)
 
+        self.savingthrowtable = SavingThrowTable(self.savingthrows)
         ui1.UI.output(f"\nSaving Throws loaded: {len(self.savingthrows)}")
 
+    def persist_hit_points(self, boundary: int = None) -> None:
+        """write changed combatants' final hit points as one batch once the configured boundary is reached
+
+        args:
+            boundary: int - HITPOINTS_PERSIST_* boundary reached (default: always write)
+        """
+        if not self.changed_hitpoints:
+            return
+
+        if boundary is not None and boundary < self.hitpoints_persist:
+            return
+
+        hitpoints: list = [
+            (combatant.combattype, combatant.abbr, combatant.seq, combatant.hpmax, combatant.hp)
+            for combatant in self.changed_hitpoints
+        ]
+        self.changed_hitpoints = {}
+        self.combat_data.update_combatants_hit_points(hitpoints)
+
     def prepare_next_encounter(self) -> None:
         """prepare next round for attack"""
         self.encounter += 1
@@ -882,79 +1664,71 @@ class Encounter:
 
         self.initiative = self.INITIATIVE_ACTIVE_MAXIMUM
         self.regenerate_combatants()
+        self.persist_hit_points(
+            self.HITPOINTS_PERSIST_ENCOUNTER if reset else self.HITPOINTS_PERSIST_ROUND
+        )
+        self.combat_data.flush_log_actions()
+        if self.checkpoint_file is not None:
+            self.snapshot()
 
     def regenerate_combatants(self) -> None:
-        """regenerate hit points for regenerative combatants"""
-        for combatant in self.combatants:
-            # No regeneration
-            if combatant.regenerationhitpoint == 0:
-                continue
+        """regenerate hit points for regenerative combatants (log rows queued)"""
+        actions: list = []
+        for combatant in self.regeneration.get_due_combatants():
+            actions.append(
+                self.get_regeneration_action(
+                    combatant, combatant.regenerationhitpoint, "regenerate hit point BEFORE"
+                )
+            )
+            combatant.regenerate_hitpoints()
+            actions.append(
+                self.get_regeneration_action(combatant, 0, "regenerate hit point AFTER")
+            )
 
-            # If combatant can regenerate hp but has no damage
-            if combatant.hp == combatant.hpmax:
-                combatant.regenerationround = 0
-                continue
+        self.combat_data.queue_log_actions(actions)
 
-            combatant.regenerationround += 1
+    def restore(self, filename: str = None) -> None:
+        """restore in-memory encounter state from a snapshot file, reconciled with the database
 
-            # (No regeneration starting round specified and can regenerate without waiting) or (regeneration round specified and regeneration round >= regeneration round start
-            if (
-                (combatant.regenerationroundstart == 0)
-                and (combatant.regenerationafterdamage == False)
-            ) or (
-                (combatant.regenerationroundstart > 0)
-                and (combatant.regenerationround >= combatant.regenerationroundstart)
-            ):
-                self.combat_data.log_action(
-                    self.encounter,
-                    self.round,
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    combatant.combattype,
-                    combatant.abbr,
-                    combatant.seq,
-                    combatant.group,
-                    combatant.initiative,
-                    combatant.hpmax,
-                    combatant.hp,
-                    combatant.regenerationhitpoint,
-                    0,
-                    0,
-                    "regenerate hit point BEFORE",
-                )
-                combatant.regenerate_hitpoints()
-                self.combat_data.update_combatant_hit_points(
-                    combatant.combattype,
-                    combatant.abbr,
-                    combatant.seq,
-                    combatant.hpmax,
-                    combatant.hp,
-                )  # update db with new regenerated hp
-                self.combat_data.log_action(
-                    self.encounter,
-                    self.round,
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    combatant.combattype,
-                    combatant.abbr,
-                    combatant.seq,
-                    combatant.group,
-                    combatant.initiative,
-                    combatant.hpmax,
-                    combatant.hp,
-                    0,
-                    0,
-                    0,
-                    "regenerate hit point AFTER",
-                )
+        Combatant rows and hit points are reloaded from the database (nothing is written back);
+        the snapshot supplies the in-memory state of combatants still in the database.
+
+        args:
+            filename: str - snapshot file (default: checkpoint file)
+        """
+        if filename is None:
+            filename = self.checkpoint_file
+
+        with open(filename, "rb") as f:
+            state: dict = pickle.loads(zlib.decompress(f.read()))
+
+        if state.get("version") != self.SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Snapshot '{filename}' version {state.get('version')} is not {self.SNAPSHOT_VERSION}"
+            )
+
+        self.encounter = state["encounter"]
+        self.round = state["round"]
+        self.initiative = state["initiative"]
+        self.ismissileattack = state["ismissileattack"]
+        self.combatant_attack_number = state["combatant_attack_number"]
+        self.dice.rng.bit_generator.state = state["dice"]
+        if self.dice.buffer is not None:
+            self.dice.buffer.blocks = state["dicebuffer"] or {}
+
+        self.combatants = []
+        self.load_combatants()
+        for combatant in self.combatants:
+            try:
+                combatantstate: dict = state["combatants"][combatant.typeabbrseq]
+            except KeyError:
+                continue  # combatant added since snapshot
+
+            for name, value in combatantstate.items():
+                setattr(combatant, name, value)
+
+        self.index_combatants()
+        self.sort_combatants_by_initiative()
 
     def roll_nonplayer_initiative(self) -> int:
         """determine initiative value for non-players (Non-Player Characters [NPC] and Monsters [M])
@@ -962,13 +1736,96 @@ class Encounter:
         returns:
             int: initiative value
         """
-        return Dice.roll_die(self.INITIATIVE_DIE_MAJOR) * 1000 + Dice.roll_die(
+        return self.dice.roll_die(self.INITIATIVE_DIE_MAJOR) * 1000 + self.dice.roll_die(
             self.INITIATIVE_DIE_MINOR
         )
 
+    def set_combatant_initiative(self, combatant: Combatant, initiative: int) -> None:
+        """change combatant initiative, repositioning it in the (sorted) combatant list
+
+        args:
+            combatant: Combatant object
+            initiative: int
+        """
+        if combatant.initiative == initiative:
+            return
+
+        low, high = self.get_initiative_positions(combatant.initiative)
+        for position in range(low, high):
+            if self.combatants[position] is combatant:
+                break
+        else:
+            position = self.combatants.index(combatant)
+
+        del self.combatants[position]
+        combatant.initiative = initiative
+        bisect.insort(self.combatants, combatant, key=self.initiative_order)
+        self.scheduler.reschedule(combatant)
+
+    def set_combatant_group(self, combatant: Combatant, group: str) -> None:
+        """move combatant to new (comma-delimited) groups
+
+        args:
+            combatant: Combatant object
+            group: str - comma-delimited group names
+        """
+        self.unindex_combatant_groups(combatant)
+        combatant.group = group
+        self.index_combatant_groups(combatant)
+
+    def remove_checkpoint(self) -> None:
+        """remove checkpoint file (i.e. after a clean quit: the database holds all state worth keeping)"""
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def snapshot(self, filename: str = None) -> None:
+        """save in-memory encounter state (round, initiative, combatant state and dice stream)
+        to a compressed snapshot file
+
+        args:
+            filename: str - snapshot file, replaced atomically (default: checkpoint file)
+        """
+        if filename is None:
+            filename = self.checkpoint_file
+
+        state: dict = {
+            "version": self.SNAPSHOT_VERSION,
+            "encounter": self.encounter,
+            "round": self.round,
+            "initiative": self.initiative,
+            "ismissileattack": self.ismissileattack,
+            "combatant_attack_number": self.combatant_attack_number,
+            "dice": self.dice.rng.bit_generator.state,
+            "dicebuffer": None if self.dice.buffer is None else self.dice.buffer.blocks,
+            "combatants": {
+                combatant.typeabbrseq: {
+                    name: getattr(combatant, name) for name in self.SNAPSHOT_STATE
+                }
+                for combatant in self.combatants
+            },
+        }
+
+        temporaryfilename: str = filename + ".tmp"
+        with open(temporaryfilename, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL)))
+
+        os.replace(temporaryfilename, filename)
+
     def sort_combatants_by_initiative(self) -> None:
-        """sort combatant list"""
-        self.combatants.sort(key=lambda c: c.initiative, reverse=True)
+        """sort (whole) combatant list; set_combatant_initiative keeps it sorted afterwards"""
+        self.combatants.sort(key=self.initiative_order)
+        self.scheduler.clear()
+
+    def unindex_combatant_groups(self, combatant: Combatant) -> None:
+        """remove combatant from each of its groups' members"""
+        for group in combatant.group.split(","):
+            members: set = self.group_index.get(group)
+            if members is None:
+                continue
+
+            members.discard(combatant)
+            if not members:
+                del self.group_index[group]
 
 
 # class Rule():
@@ -1011,3 +1868,124 @@ class Saving_Throw:
     def __str__(self) -> str:
         message: str = f"Class: {self.classtype} Level: {self.level}"
         return message
+
+
+class SavingThrowTable:
+    """saving throw values keyed by (classtype, level)
+
+    Single lookups use a dict; lookups for many defenders index a dense
+    (classtype, level, saving throw type) array in one vectorized call.
+    """
+
+    def __init__(self, savingthrows: list) -> None:
+        self.savingthrows: dict = {}
+        for savingthrow in savingthrows:
+            # first row wins for a duplicate (classtype, level), as with a linear scan
+            self.savingthrows.setdefault((savingthrow.classtype, savingthrow.level), savingthrow)
+
+        # dense array holds integer levels only (dict lookups still see every row)
+        levels: dict = {
+            key: savingthrow
+            for key, savingthrow in self.savingthrows.items()
+            if isinstance(key[1], int) and key[1] >= 0
+        }
+        self.classtypes: dict = {}  # classtype: array row
+        for classtype, _ in levels:
+            self.classtypes.setdefault(classtype, len(self.classtypes))
+
+        self.levelmaximum: int = max((level for _, level in levels), default=0)
+        shape: tuple = (
+            len(self.classtypes),
+            self.levelmaximum + 1,
+            len(Saving_Throw.SAVING_THROW_TYPE),
+        )
+        self.values: np.ndarray = np.zeros(shape, dtype=np.int64)
+        self.isknown: np.ndarray = np.zeros(shape[:2], dtype=bool)
+        for (classtype, level), savingthrow in levels.items():
+            row: int = self.classtypes[classtype]
+            self.values[row, level] = [
+                savingthrow.detail[attacktype] for attacktype in Saving_Throw.SAVING_THROW_TYPE
+            ]
+            self.isknown[row, level] = True
+
+    def __len__(self) -> int:
+        return len(self.savingthrows)
+
+    def get_saving_throw(
+        self, classtype: str, level: int, levelpdm: int, attacktype: str
+    ) -> int:
+        """get saving throw value (0 if unknown)
+
+        args:
+            classtype: str
+            level: int
+            levelpdm: int - level used vs. poison and death magic
+            attacktype: str
+        returns:
+            int: saving throw value
+        """
+        savingthrow: Saving_Throw = None
+        if attacktype in Saving_Throw.SAVING_THROW_POISON_DEATH_MAGIC:
+            savingthrow = self.savingthrows.get((classtype, levelpdm))
+
+        if savingthrow is None:
+            savingthrow = self.savingthrows.get((classtype, level))
+
+        if savingthrow is None:
+            return 0
+
+        return savingthrow.detail[attacktype]
+
+    def get_saving_throws(
+        self, classtypes: list, levels: list, levelspdm: list, attacktype: str
+    ) -> np.ndarray:
+        """get saving throw values of many defenders (0 where unknown)
+
+        Defenders with a non-integer level (i.e. '' or None) are looked up one by one.
+
+        args:
+            classtypes: list of str
+            levels: list of int
+            levelspdm: list of int - levels used vs. poison and death magic
+            attacktype: str
+        returns:
+            np.ndarray: saving throw value per defender
+        """
+        rows: np.ndarray = np.array(
+            [self.classtypes.get(classtype, -1) for classtype in classtypes], dtype=np.int64
+        )
+        column: int = Saving_Throw.SAVING_THROW_TYPE.index(attacktype)
+        irregular: list = [
+            index
+            for index, (level, levelpdm) in enumerate(zip(levels, levelspdm))
+            if not (isinstance(level, int) and isinstance(levelpdm, int))
+        ]
+        levelarray: np.ndarray = self.get_level_array(levels)
+        if attacktype in Saving_Throw.SAVING_THROW_POISON_DEATH_MAGIC:
+            levelpdmarray: np.ndarray = self.get_level_array(levelspdm)
+            levelarray = np.where(self.is_known(rows, levelpdmarray), levelpdmarray, levelarray)
+
+        known: np.ndarray = self.is_known(rows, levelarray)
+        savingthrows: np.ndarray = np.where(
+            known,
+            self.values[np.where(known, rows, 0), np.where(known, levelarray, 0), column],
+            0,
+        )
+        for index in irregular:
+            savingthrows[index] = self.get_saving_throw(
+                classtypes[index], levels[index], levelspdm[index], attacktype
+            )
+
+        return savingthrows
+
+    @staticmethod
+    def get_level_array(levels: list) -> np.ndarray:
+        """levels as integer array (-1: not an integer level)"""
+        return np.array(
+            [level if isinstance(level, int) else -1 for level in levels], dtype=np.int64
+        )
+
+    def is_known(self, rows: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """known (classtype row, level) mask"""
+        inrange: np.ndarray = (rows >= 0) & (levels >= 0) & (levels <= self.levelmaximum)
+        return inrange & self.isknown[np.where(inrange, rows, 0), np.where(inrange, levels, 0)]
@@ -1,6 +1,60 @@
-from random import randint
+from functools import lru_cache
+import numpy as np
 
 class Dice:
+    SCALAR_DICE_MAXIMUM = 4  # single rolls of at most this many dice draw each die as a scalar
+
+    rng: np.random.Generator = np.random.default_rng()
+    buffer: "DiceBuffer" = None
+
+    @classmethod
+    def bind(cls, rng: np.random.Generator) -> type:
+        """create Dice class rolling from its own random number generator stream
+        
+        args:
+            rng: np.random.Generator - random number generator stream
+        
+        returns:
+            type - Dice subclass bound to rng
+        """
+        return type(cls.__name__, (cls,), {"rng": rng, "buffer": None})
+
+    @classmethod
+    def buffered(cls, block_size: int = None) -> type:
+        """create Dice class serving single die rolls from pre-drawn blocks of its stream
+        
+        args:
+            block_size: int - number of rolls drawn per die size refill
+        
+        returns:
+            type - Dice subclass with its own DiceBuffer
+        """
+        return type(cls.__name__, (cls,), {"buffer": DiceBuffer(cls.rng, block_size)})
+
+    @classmethod
+    def roll_many(cls, die_sides, dice_number = 1, rolls = 1, die_modifier = 0, roll_modifier = 0) -> np.ndarray:
+        """calculate many random dice rolls at once based on die sides, numbers, and modifiers
+        
+        args:
+            die_sides: int | np.ndarray - number of sides on the die (or per roll)
+            dice_number: int - number of dice to roll per roll
+            rolls: int - number of rolls to make
+            die_modifier: int - modifier to add to each die roll
+            roll_modifier: int - modifier to add to each total roll
+        
+        returns:
+            np.ndarray - total roll result of each roll
+        """
+        if dice_number <= 0:
+            return np.full(rolls, roll_modifier, dtype=np.int64)
+
+        faces = np.asarray(die_sides) + die_modifier
+        if faces.ndim:
+            faces = faces[:, np.newaxis]  # die sides vary per roll
+
+        results = cls.rng.integers(1, faces, size=(rolls, dice_number), endpoint=True)
+        return results.sum(axis=1) + roll_modifier
+
     @classmethod        
     def roll_dice(cls, die_sides, dice_number = 1, die_modifier = 0, roll_modifier = 0) -> int:
         """calculate random dice roll based on die sides, numbers, and modifiers
@@ -14,12 +68,14 @@ class Dice:
         returns:
             int - total roll result
         """
-        result = 0
-        for _ in range(0, dice_number):
-            result += randint(1, die_sides + die_modifier)
+        faces: int = die_sides + die_modifier
+        if cls.buffer is not None:
+            return sum(cls.buffer.draw(faces) for _ in range(dice_number)) + roll_modifier
+
+        if dice_number <= cls.SCALAR_DICE_MAXIMUM:
+            return sum(int(cls.rng.integers(1, faces + 1)) for _ in range(dice_number)) + roll_modifier
 
-        result += roll_modifier        
-        return result
+        return int(cls.rng.integers(1, faces + 1, size=dice_number).sum()) + roll_modifier
     
     @classmethod
     def roll_die(cls, die_sides, die_modifier = 0) -> int:
@@ -32,7 +88,10 @@ class Dice:
         returns:
             int - die roll result
         """
-        return randint(1, die_sides) + die_modifier
+        if cls.buffer is not None:
+            return cls.buffer.draw(die_sides) + die_modifier
+
+        return int(cls.rng.integers(1, die_sides + 1)) + die_modifier
 
     @classmethod
     def roll_d4(cls, die_number = 1, die_modifier = 0, roll_modifier = 0) -> int:
@@ -131,3 +190,195 @@ class Dice:
             int - total roll result
         """
         return cls.roll_dice(100, die_number, die_modifier, roll_modifier)
+
+
+
+class DiceBuffer:
+    """pre-drawn blocks of uniform die rolls (one block per die size) served one roll at a time"""
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, rng: np.random.Generator, block_size: int = None):
+        self.rng: np.random.Generator = rng
+        self.block_size: int = self.BLOCK_SIZE if block_size is None else block_size
+        self.blocks: dict = {}
+
+    def draw(self, die_sides: int) -> int:
+        """get next die roll, refilling die size's block when exhausted
+
+        args:
+            die_sides: int - number of sides on the die
+        returns:
+            int - die roll result
+        """
+        try:
+            return self.blocks[die_sides].pop()
+        except (KeyError, IndexError):
+            self.refill(die_sides)
+            return self.blocks[die_sides].pop()
+
+    def refill(self, die_sides: int) -> None:
+        """draw new block of rolls for die size
+
+        args:
+            die_sides: int - number of sides on the die
+        """
+        self.blocks[die_sides] = self.rng.integers(
+            1, die_sides, size=self.block_size, endpoint=True
+        ).tolist()
+
+
+class DiceDistribution:
+    """exact probability distribution of a dice roll total"""
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, minimum: int, pmf: np.ndarray):
+        self.minimum: int = minimum
+        self.pmf: np.ndarray = pmf
+        self.pmf.flags.writeable = False
+        self.cdf: np.ndarray = np.cumsum(pmf)
+        self.cdf.flags.writeable = False
+
+    def __add__(self, other: "DiceDistribution") -> "DiceDistribution":
+        """distribution of the sum of two independent rolls"""
+        return DiceDistribution(self.minimum + other.minimum, np.convolve(self.pmf, other.pmf))
+
+    def __str__(self) -> str:
+        message: str = f"Min: {self.minimum} Max: {self.maximum} Mean: {self.mean():.2f}"
+        return message
+
+    @classmethod
+    def for_roll(cls, die_sides, dice_number = 1, die_modifier = 0, roll_modifier = 0) -> "DiceDistribution":
+        """get (cached) distribution of Dice.roll_dice with the same arguments
+
+        args:
+            die_sides: int - number of sides on the die
+            dice_number: int - number of dice to roll
+            die_modifier: int - modifier to add to each die roll
+            roll_modifier: int - modifier to add to the total roll
+
+        returns:
+            DiceDistribution - distribution of the roll total
+        """
+        return _roll_distribution(die_sides, dice_number, die_modifier, roll_modifier)
+
+    @classmethod
+    def cache_info(cls):
+        """get roll distribution cache statistics"""
+        return _roll_distribution.cache_info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """clear roll distribution cache"""
+        _roll_distribution.cache_clear()
+
+    @property
+    def maximum(self) -> int:
+        return self.minimum + len(self.pmf) - 1
+
+    @property
+    def values(self) -> np.ndarray:
+        return np.arange(self.minimum, self.maximum + 1)
+
+    def mean(self) -> float:
+        """expected roll total"""
+        return float(np.dot(self.values, self.pmf))
+
+    def variance(self) -> float:
+        """variance of roll total"""
+        return float(np.dot((self.values - self.mean()) ** 2, self.pmf))
+
+    def probability(self, value: int) -> float:
+        """probability that roll total equals value"""
+        if value < self.minimum or value > self.maximum:
+            return 0.0
+
+        return float(self.pmf[value - self.minimum])
+
+    def probability_at_most(self, value: int) -> float:
+        """probability that roll total is less than or equal to value"""
+        if value < self.minimum:
+            return 0.0
+
+        if value >= self.maximum:
+            return 1.0
+
+        return float(self.cdf[value - self.minimum])
+
+    def probability_at_least(self, value: int) -> float:
+        """probability that roll total is greater than or equal to value (i.e. kill probability vs. hit points)"""
+        return 1.0 - self.probability_at_most(value - 1)
+
+    def shift(self, modifier: int) -> "DiceDistribution":
+        """distribution of roll total plus a fixed modifier"""
+        return DiceDistribution(self.minimum + modifier, self.pmf.copy())
+
+
+class DiceStreams:
+    """factory of statistically independent, reproducible Dice random number streams"""
+
+    def __init__(self, seed = None):
+        """args:
+            seed: int | np.random.SeedSequence - root seed (None for fresh OS entropy)
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence: np.random.SeedSequence = seed
+        else:
+            self.seed_sequence: np.random.SeedSequence = np.random.SeedSequence(seed)
+
+    @property
+    def entropy(self) -> int:
+        """root entropy (pass as seed to reproduce all streams)"""
+        return self.seed_sequence.entropy
+
+    def spawn(self, streams: int = 1) -> list:
+        """spawn independent Dice classes (i.e. one per worker thread)
+
+        args:
+            streams: int - number of streams to spawn
+        returns:
+            list: Dice subclasses, each bound to its own PCG64 generator
+        """
+        return [
+            Dice.bind(np.random.Generator(np.random.PCG64(seed_sequence)))
+            for seed_sequence in self.seed_sequence.spawn(streams)
+        ]
+
+    def spawn_dice(self) -> type:
+        """spawn single independent Dice class"""
+        return self.spawn(1)[0]
+
+    def spawn_streams(self, streams: int = 1) -> list:
+        """spawn independent (picklable) stream factories (i.e. one per worker process)
+
+        args:
+            streams: int - number of stream factories to spawn
+        returns:
+            list: DiceStreams children
+        """
+        return [DiceStreams(seed_sequence) for seed_sequence in self.seed_sequence.spawn(streams)]
+
+
+@lru_cache(maxsize=DiceDistribution.CACHE_SIZE)
+def _roll_distribution(die_sides, dice_number, die_modifier, roll_modifier) -> DiceDistribution:
+    """convolve single die distribution dice_number times (by repeated squaring)"""
+    if dice_number <= 0:
+        return DiceDistribution(roll_modifier, np.ones(1))
+
+    faces: int = die_sides + die_modifier
+    if faces < 1:
+        raise ValueError(f"die with {faces} faces cannot be rolled")
+
+    die: np.ndarray = np.full(faces, 1.0 / faces)
+    pmf: np.ndarray = np.ones(1)
+    remaining: int = dice_number
+    while remaining:
+        if remaining & 1:
+            pmf = np.convolve(pmf, die)
+
+        remaining >>= 1
+        if remaining:
+            die = np.convolve(die, die)
+
+    return DiceDistribution(dice_number + roll_modifier, pmf)
@@ -0,0 +1,179 @@
+# diceexpression.py
+
+from functools import lru_cache
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+from lib.dice import Dice, DiceDistribution
+
+
+class DiceTerm(NamedTuple):
+    """single dice term of an expression (i.e. 2d6+1)"""
+
+    dice_number: int
+    die_sides: int
+    roll_modifier: int
+
+    def __str__(self) -> str:
+        modifier: str = f"{self.roll_modifier:+d}" if self.roll_modifier else ""
+        return f"{self.dice_number}d{self.die_sides}{modifier}"
+
+    def distribution(self) -> DiceDistribution:
+        """exact distribution of term total"""
+        return DiceDistribution.for_roll(self.die_sides, self.dice_number, 0, self.roll_modifier)
+
+    def roll(self, dice: type = Dice) -> int:
+        """roll term once"""
+        return dice.roll_dice(self.die_sides, self.dice_number, 0, self.roll_modifier)
+
+    def roll_many(self, rolls: int, dice: type = Dice) -> np.ndarray:
+        """roll term many times"""
+        return dice.roll_many(self.die_sides, self.dice_number, rolls, 0, self.roll_modifier)
+
+
+class DamagePlan(NamedTuple):
+    """compiled (immutable) roll plan of a damage per attack expression
+
+    Expressions are free text (i.e. "1d8/1d8/2d6+1", "2d8 (x2); 2d6 (X3)" or
+    "Bow: 1d6/1d6|Spear: 1d6/1d8"). Each '|'-delimited option (weapon or form) holds
+    its dice terms in attack order; "(xN)" repeats a term for N attacks. An option may
+    start with a "name:" label and terms may be followed by word labels ("CLAW", "(bite)").
+    Anything else (compound terms like 1d4+1d4, size alternatives like "(SM) ... (L)",
+    "1d6/2", notes with numbers) makes the whole plan empty, so damage is entered manually.
+    """
+
+    ATTACK_SEPARATOR = re.compile(r"[/;,]")
+    CACHE_SIZE = 1024
+    OPTION_LABEL_PATTERN = re.compile(r"[^:]*:")
+    OPTION_SEPARATOR = "|"
+    SIZE_LABEL_PATTERN = re.compile(r"\((?:S|M|L|SM|ML|SML)\)", re.IGNORECASE)
+    TERM_PATTERN = re.compile(
+        r"\s*(\d*)d(\d+)((?:\s*[+-]\s*\d+(?!\d|\s*d))*)"  # dice term (modifiers stop before a next term)
+        r"\s*(?:\(\s*x\s*(\d+)\s*\))?"  # (xN) attacks
+        r"((?:\s*(?:[a-z]+|\([a-z][a-z /]*\)))*)\s*",  # word labels
+        re.IGNORECASE,
+    )
+
+    expression: str
+    options: tuple
+
+    def __bool__(self) -> bool:
+        return len(self.options) > 0
+
+    @classmethod
+    def compile(cls, expression: str) -> "DamagePlan":
+        """get (cached) compiled roll plan for expression
+
+        args:
+            expression: str - damage per attack expression
+        returns:
+            DamagePlan: compiled roll plan
+        """
+        return _compile_damage_plan(str(expression or ""))
+
+    @classmethod
+    def parse(cls, expression: str) -> "DamagePlan":
+        """parse expression into roll plan (uncached)
+
+        args:
+            expression: str - damage per attack expression
+        returns:
+            DamagePlan: compiled roll plan
+        """
+        options: list = []
+        for option in expression.split(cls.OPTION_SEPARATOR):
+            terms: list = cls.parse_option(option)
+            if terms is None:
+                return cls(expression, ())  # not a simple expression: damage entered manually
+
+            if terms:
+                options.append(tuple(terms))
+
+        return cls(expression, tuple(options))
+
+    @classmethod
+    def parse_option(cls, option: str) -> list:
+        """parse option (weapon or form) into its dice terms in attack order
+
+        args:
+            option: str - option text
+        returns:
+            list: DiceTerm of each attack (None if option is not a simple expression)
+        """
+        label = cls.OPTION_LABEL_PATTERN.match(option)
+        if label and not re.search(r"\d*d\d+", label.group(), re.IGNORECASE):
+            option = option[label.end():]
+
+        terms: list = []
+        for attack in cls.ATTACK_SEPARATOR.split(option):
+            if not attack.strip():
+                continue
+
+            match = cls.TERM_PATTERN.fullmatch(attack)
+            if match is None or cls.SIZE_LABEL_PATTERN.search(match.group(5)):
+                return None
+
+            dice_number, die_sides, modifiers, attacks, _ = match.groups()
+            term = DiceTerm(
+                int(dice_number or 1),
+                int(die_sides),
+                sum(int(m.replace(" ", "")) for m in re.findall(r"[+-]\s*\d+", modifiers)),
+            )
+            terms.extend([term] * int(attacks or 1))
+
+        return terms
+
+    def distribution(self, attack_number: int = 1, option: int = 0) -> DiceDistribution:
+        """exact damage distribution of attack
+
+        args:
+            attack_number: int - attack number within round (1-based)
+            option: int - option (weapon or form) index
+        returns:
+            DiceDistribution: damage distribution
+        """
+        return self.get_term(attack_number, option).distribution()
+
+    def get_term(self, attack_number: int = 1, option: int = 0) -> DiceTerm:
+        """get dice term for attack (cycles through option's terms)
+
+        args:
+            attack_number: int - attack number within round (1-based)
+            option: int - option (weapon or form) index
+        returns:
+            DiceTerm: dice term of attack
+        """
+        terms: tuple = self.options[option]
+        return terms[(attack_number - 1) % len(terms)]
+
+    def roll(self, attack_number: int = 1, option: int = 0, dice: type = Dice) -> int:
+        """roll damage of attack
+
+        args:
+            attack_number: int - attack number within round (1-based)
+            option: int - option (weapon or form) index
+            dice: type - Dice class (stream) to roll with
+        returns:
+            int: damage rolled
+        """
+        return self.get_term(attack_number, option).roll(dice)
+
+    def roll_many(self, rolls: int, attack_number: int = 1, option: int = 0, dice: type = Dice) -> np.ndarray:
+        """roll damage of attack many times
+
+        args:
+            rolls: int - number of rolls to make
+            attack_number: int - attack number within round (1-based)
+            option: int - option (weapon or form) index
+            dice: type - Dice class (stream) to roll with
+        returns:
+            np.ndarray: damage of each roll
+        """
+        return self.get_term(attack_number, option).roll_many(rolls, dice)
+
+
+@lru_cache(maxsize=DamagePlan.CACHE_SIZE)
+def _compile_damage_plan(expression: str) -> DamagePlan:
+    return DamagePlan.parse(expression)
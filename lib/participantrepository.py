@@ -0,0 +1,76 @@
+# participantrepository.py
+
+from collections import OrderedDict
+
+from lib.combatdata import CombatData
+
+
+class ParticipantRepository:
+    """lazy participant catalog: participant rows are fetched by Abbr on first use
+    (or prefetched in bulk) and kept in a bounded least-recently-used cache"""
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, combat_data: CombatData, cache_size: int = None) -> None:
+        """
+        args:
+            combat_data: CombatData - data connection
+            cache_size: int - maximum cached participants (default: CACHE_SIZE)
+        """
+        self.combat_data: CombatData = combat_data
+        self.cache_size: int = self.CACHE_SIZE if cache_size is None else cache_size
+        self.participants: OrderedDict = OrderedDict()  # Abbr: participant row (least recently used first)
+
+    def __contains__(self, abbr: str) -> bool:
+        return abbr in self.participants
+
+    def __getitem__(self, abbr: str) -> dict:
+        """get participant row, fetching it from database if not cached
+
+        args:
+            abbr: str
+        returns:
+            dict: participant row
+        raises:
+            KeyError: participant does not exist
+        """
+        try:
+            self.participants.move_to_end(abbr)
+            return self.participants[abbr]
+        except KeyError:
+            pass
+
+        self.prefetch([abbr])
+        return self.participants[abbr]
+
+    def __len__(self) -> int:
+        return len(self.participants)
+
+    def add(self, abbr: str, participant: dict) -> None:
+        """cache participant row, evicting least recently used rows beyond cache size
+
+        args:
+            abbr: str
+            participant: dict - participant row
+        """
+        self.participants[abbr] = participant
+        self.participants.move_to_end(abbr)
+        while len(self.participants) > self.cache_size:
+            self.participants.popitem(last=False)
+
+    def clear(self) -> None:
+        """forget cached participants (i.e. after the catalog changed)"""
+        self.participants.clear()
+
+    def prefetch(self, abbrs) -> None:
+        """fetch all not yet cached participants in one bulk query
+
+        args:
+            abbrs: iterable of Abbr
+        """
+        missing: list = [abbr for abbr in dict.fromkeys(abbrs) if abbr not in self.participants]
+        if not missing:
+            return
+
+        for abbr, participant in self.combat_data.load_participants_by_abbr(missing).items():
+            self.add(abbr, participant)
@@ -0,0 +1,202 @@
+# session.py
+
+from itertools import count
+import threading
+
+from lib.combatdata import CombatData
+from lib.combatmodel import Encounter
+import lib.combatdatafactory as cdf1
+
+
+class SessionManager:
+    """hosts many independent Encounter sessions (tables or simulations) in one process
+
+    Each session owns its combat state and dice stream. Sessions either get their own
+    data connection (closed with the session) or borrow one from a bounded pool of at most
+    pool_size connections; a pooled connection is used by one session at a time and is
+    returned (with its log buffer flushed) when the session closes. Creating a session
+    waits while all pooled connections are in use. The session registry is thread-safe;
+    a single session should only be used by one thread at a time.
+    """
+
+    def __init__(self, pool_size: int = None, combat_data_factory=None) -> None:
+        """
+        args:
+            pool_size: int - maximum open data connections, reused by later sessions
+                (default: one connection per session)
+            combat_data_factory: factory with create_combatdata() (default: CombatDataFactory)
+        """
+        if pool_size is not None and pool_size < 1:
+            raise ValueError(f"Invalid pool size {pool_size}")
+
+        self.pool_size: int = pool_size
+        self.combat_data_factory = combat_data_factory or cdf1.CombatDataFactory()
+        self.pool: list = []  # idle pooled data connections
+        self.connections: int = 0  # open pooled data connections (idle or in use)
+        self.sessions: dict = {}  # session id: Encounter
+        self.session_ids = count(1)
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)  # pooled data connection returned
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self.sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def acquire_combat_data(self, timeout: float = None) -> CombatData:
+        """get data connection for a new session: a new one or, when pooled, an idle
+        (or new, while below pool size) one
+
+        args:
+            timeout: float - seconds to wait for a pooled connection (default: no limit)
+        returns:
+            CombatData: data connection
+        raises:
+            TimeoutError: no pooled connection returned in time
+        """
+        if self.pool_size is None:
+            combat_data, _, _ = self.combat_data_factory.create_combatdata()
+            return combat_data
+
+        with self.released:
+            if not self.released.wait_for(
+                lambda: self.pool or self.connections < self.pool_size, timeout
+            ):
+                raise TimeoutError(f"All {self.pool_size} data connections in use")
+
+            if self.pool:
+                return self.pool.pop()
+
+            self.connections += 1
+
+        try:
+            combat_data, _, _ = self.combat_data_factory.create_combatdata()
+        except:
+            with self.released:
+                self.connections -= 1
+                self.released.notify()
+
+            raise
+
+        return combat_data
+
+    def close(self) -> None:
+        """close all (created) sessions and pooled data connections"""
+        with self.lock:
+            session_ids: list = [
+                session_id
+                for session_id, encounter in self.sessions.items()
+                if encounter is not None  # skip sessions still being created
+            ]
+
+        for session_id in session_ids:
+            self.close_session(session_id)
+
+        with self.lock:
+            pool, self.pool = self.pool, []
+            self.connections -= len(pool)
+
+        for combat_data in pool:
+            combat_data.close()
+
+    def close_session(self, session_id) -> None:
+        """close session and close (or return to pool) its data connection
+
+        args:
+            session_id: session id
+        raises:
+            KeyError: session does not exist or is still being created
+        """
+        with self.lock:
+            if self.sessions[session_id] is None:
+                raise KeyError(f"Session {session_id} is still being created")
+
+            encounter: Encounter = self.sessions.pop(session_id)
+
+        self.release_combat_data(encounter.combat_data)
+
+    def create_session(
+        self,
+        session_id=None,
+        seed: int = None,
+        buffered_dice: bool = False,
+        timeout: float = None,
+    ) -> tuple:
+        """create new encounter session
+
+        args:
+            session_id: session id (default: next number)
+            seed: int - dice stream seed
+            buffered_dice: bool - serve single dice rolls from pre-drawn blocks
+            timeout: float - seconds to wait for a pooled connection (default: no limit)
+        returns:
+            tuple: (session id, Encounter)
+        """
+        with self.lock:
+            if session_id is None:
+                session_id = next(self.session_ids)
+
+            if session_id in self.sessions:
+                raise KeyError(f"Session {session_id} already exists")
+
+            self.sessions[session_id] = None  # reserve id while connecting
+
+        combat_data: CombatData = None
+        try:
+            combat_data = self.acquire_combat_data(timeout)
+            encounter = Encounter(seed, buffered_dice, combat_data)
+        except:
+            with self.lock:
+                if session_id in self.sessions and self.sessions[session_id] is None:
+                    del self.sessions[session_id]  # release reserved id
+
+            if combat_data is not None:
+                self.release_combat_data(combat_data)
+
+            raise
+
+        with self.lock:
+            reserved: bool = session_id in self.sessions and self.sessions[session_id] is None
+            if reserved:
+                self.sessions[session_id] = encounter
+
+        if not reserved:
+            self.release_combat_data(combat_data)
+            raise KeyError(f"Session {session_id} was removed while being created")
+
+        return session_id, encounter
+
+    def get_session(self, session_id) -> Encounter:
+        """get session
+
+        args:
+            session_id: session id
+        returns:
+            Encounter: session
+        """
+        return self.sessions[session_id]
+
+    def release_combat_data(self, combat_data: CombatData) -> None:
+        """close session data connection or, when pooled, return it to the pool
+
+        args:
+            combat_data: CombatData - data connection
+        """
+        if self.pool_size is None:
+            combat_data.close()
+            return
+
+        try:
+            combat_data.flush_log_actions()  # no buffered log rows carry over to the next session
+        except:
+            with self.released:
+                self.connections -= 1
+                self.released.notify()
+
+            combat_data.close()
+            raise
+
+        with self.released:
+            self.pool.append(combat_data)
+            self.released.notify()
@@ -4,10 +4,17 @@ from abc import (
     ABCMeta,
     abstractmethod,
 )
+import os
+
 import lib.combatmodel as cm1
-from lib.dice import Dice
 import lib.ui as ui1
 
+# persist log rows and hit points on a writer thread (own connection): prompts stop waiting
+# on the database, but reloads may briefly miss writes the backend has not yet made visible
+BACKGROUND_WRITES = False
+CHECKPOINT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "meleemanager.checkpoint"
+)
 EXIT_TO_MENU = "@@"
 
 
@@ -132,9 +139,21 @@ class MeleeManager:
         self.ui.output_separator_line("=")
 
         # get database reference
-        self.encounter = cm1.Encounter()
-        process_load_participants(self.ui, self.encounter)
-        process_load_combatants(self.ui, self.encounter)
+        self.encounter = cm1.Encounter(
+            checkpoint_file=CHECKPOINT_FILE,
+            background_writes=BACKGROUND_WRITES,
+        )
+
+        # combatants' participants are fetched on demand (action 0 loads the full catalog)
+        if os.path.exists(CHECKPOINT_FILE) and (
+            len(self.ui.get_input("Restore last checkpoint? (<Enter> for No, Y for Yes) ")) > 0
+        ):
+            self.encounter.restore()
+            self.ui.output(
+                f"Checkpoint restored: encounter {self.encounter.encounter}, round {self.encounter.round}"
+            )
+        else:
+            process_load_combatants(self.ui, self.encounter)
 
         # define actions
         self.actions = [
@@ -168,6 +187,11 @@ class MeleeManager:
                 ui1.UI.output(f"*{action_code}* not a valid action\n")
                 continue
 
+            try:
+                self.encounter.combat_data.check_errors()
+            except Exception as error:
+                ui1.UI.output(f"*Database write failed*: {error}\n")
+
             try:
                 action.process(self.ui, self.encounter)
                 continue
@@ -213,7 +237,9 @@ class QuitAction(Action):
         super().__init__(99, "Quit")
 
     def process(self, ui, encounter):
+        encounter.persist_hit_points()
         encounter.combat_data.close()
+        encounter.remove_checkpoint()
         raise QuitException
 
     def __str__(self):
@@ -307,47 +333,30 @@ def find_next_defender(ui, encounter, attacker) -> cm1.Combatant:
                 continue
 
         # check if defender is in combatant list
-        defender_count = 0
-        defender_is_invalid = False
-        defender_is_dead = False
-        for defender in encounter.combatants:
-            defender_count += 1
-            if defender.typeabbrseq == defender_typeabbrseq:
-                if defender.combattype == attacker.combattype:
-                    if (
-                        len(
-                            get_input(
-                                ui,
-                                f"{ui.INDENT_LEVEL_03}{attacker.typeabbrseq} and {defender.typeabbrseq} are both friends. Are you sure? (<Enter> for No, y for Yes) ",
-                            )
+        if (defender := encounter.find_combatant(defender_typeabbrseq)) is not None:
+            if defender.combattype == attacker.combattype:
+                if (
+                    len(
+                        get_input(
+                            ui,
+                            f"{ui.INDENT_LEVEL_03}{attacker.typeabbrseq} and {defender.typeabbrseq} are both friends. Are you sure? (<Enter> for No, y for Yes) ",
                         )
-                        == 0
-                    ):
-                        defender_is_invalid = True
-                        attacker.defender_typeabbrseq = ""
-                        defender_typeabbrseq = ""
-                        break
-
-                if defender.is_alive():
-                    attacker.defender_typeabbrseq = defender_typeabbrseq
-                    return defender
-                else:
-                    defender_is_dead = True
-                    ui.output(f"{ui.INDENT_LEVEL_03}{defender.typeabbrseq} is dead")
+                    )
+                    == 0
+                ):
                     attacker.defender_typeabbrseq = ""
                     defender_typeabbrseq = ""
+                    continue
 
-                break
+            if defender.is_alive():
+                attacker.defender_typeabbrseq = defender_typeabbrseq
+                return defender
 
-        if defender_is_dead or defender_is_invalid:
+            ui.output(f"{ui.INDENT_LEVEL_03}{defender.typeabbrseq} is dead")
+            attacker.defender_typeabbrseq = ""
+            defender_typeabbrseq = ""
             continue
 
-        # all combatants checked and defender not found (still alive but not in combatant list)
-        if defender_count == len(encounter.combatants) and defender_typeabbrseq == "":
-            raise Exception(
-                f"ERROR occurred during Attacker {attacker.typeabbrseq}'s attack. Defender unknown. (find_next_defender)"
-            )
-
         # previous defender not found in combatant list because someone else kill them but they were still set as attacker's defender
         print(
             f"{ui.INDENT_LEVEL_03}Defender {defender_typeabbrseq} not found. Try again"
@@ -365,17 +374,17 @@ def get_all_combatants_initiative(ui, encounter) -> None:
     """
     if encounter.round == 1:
         if len(get_input(ui, f"Roll initiative? (<Enter> for Yes, N for No) ")) > 0:
-            encounter.sort_combatants_by_initiative()
             return
     else:
         if len(get_input(ui, f"Re-roll initiative? (<Enter> for No, Y for Yes) ")) == 0:
-            encounter.sort_combatants_by_initiative()
             return
 
     ui.output("\nEnter Initiative:")
-    for combatant in encounter.combatants:
+    for combatant in list(encounter.combatants):  # combatant list is re-ordered as initiatives change
         if combatant.is_dungeon_master():
-            combatant.initiative = encounter.INITIATIVE_ACTIVE_MAXIMUM
+            encounter.set_combatant_initiative(
+                combatant, encounter.INITIATIVE_ACTIVE_MAXIMUM
+            )
             continue
 
         if combatant.is_player_character():
@@ -393,7 +402,9 @@ def get_all_combatants_initiative(ui, encounter) -> None:
                     continue
 
             # auto-roll new initiative
-            combatant.initiative = encounter.roll_nonplayer_initiative()
+            encounter.set_combatant_initiative(
+                combatant, encounter.roll_nonplayer_initiative()
+            )
             ui.output(
                 f"{ui.INDENT_LEVEL_01}{combatant.typeabbrseq}'s initiative set to {combatant.initiative}"
             )
@@ -412,6 +423,7 @@ def get_all_combatants_initiative(ui, encounter) -> None:
             combatant.hp,
         )
 
+    encounter.combat_data.flush_log_actions()
     return
 
 
@@ -474,7 +486,7 @@ def get_combatant_initiative(ui, encounter, combatant) -> None:
             ):
                 continue
 
-            combatant.initiative = initiative
+            encounter.set_combatant_initiative(combatant, initiative)
             inactivereason = ""
             while len(inactivereason) == 0:
                 message = f"{ui.INDENT_LEVEL_04}Reason for inactivity? "
@@ -485,10 +497,41 @@ def get_combatant_initiative(ui, encounter, combatant) -> None:
 
             combatant.inactivereason = inactivereason
 
-        combatant.initiative = initiative
+        encounter.set_combatant_initiative(combatant, initiative)
         break
 
 
+def get_damage_roll(ui, encounter, combatant, message) -> int:
+    """get damage roll value
+
+    args:
+        ui: user interface
+        encounter: current Encounter
+        combatant: current Combatant
+        message: str attack type message
+
+    returns:
+        damage: int value of damage
+    """
+    damage_prompt = f"{ui.INDENT_LEVEL_02}Enter {message} damage: "
+    if combatant.is_player_character() or not combatant.damageplan:
+        return get_numeric_input(ui, damage_prompt)
+
+    # non-players can auto-roll damage from compiled damage per attack
+    damage_term = combatant.damageplan.get_term(encounter.combatant_attack_number)
+    damage_prompt += f"(<Enter> for autoroll {damage_term}) "
+    while True:
+        if len(damage_input := get_input(ui, damage_prompt)) == 0:
+            damage = damage_term.roll(encounter.dice)
+            ui.output(f"{ui.INDENT_LEVEL_02}ROLLED {damage}")
+            return damage
+
+        try:
+            return int(damage_input)
+        except ValueError:
+            ui.output(f"{ui.INDENT_LEVEL_03}Entered value must be numeric")
+
+
 def get_defenders(ui, encounter, attacker) -> list:
     """get a list of defenders by typeabbrseq and/or group
     This function allows the user to enter a comma-delimited list of defenders by typeabbrseq and/or group.
@@ -501,7 +544,6 @@ def get_defenders(ui, encounter, attacker) -> list:
     Returns:
         defenders: list of Combatant defenders
     """
-    defenders = []
     special_attack_defenders_message = f"{ui.INDENT_LEVEL_02}Enter comma-delimited defenders by typeabbrseq and/or #group: "
     special_attack_defenders_raw = ""
     while len(special_attack_defenders_raw) == 0:
@@ -558,42 +600,24 @@ def get_defenders(ui, encounter, attacker) -> list:
     if len(special_attack_defenders) == 0:
         return []
 
-    # remove duplicates
-    special_attack_defenders = list(set(special_attack_defenders))
+    # build set of defender groups
+    special_attack_groups = {
+        defender[1:] for defender in special_attack_defenders if defender[0:1] == "#"
+    }
 
-    # build list of defender groups
-    special_attack_groups = [
-        group[1:] for group in special_attack_defenders if group[0:1] == "#"
-    ]
-
-    # append group defenders to defender list
-    [
-        special_attack_defenders.append(combatant.typeabbrseq)
-        for combatant in encounter.combatants
-        if (
-            has_common_substring_elements(
-                combatant.group.split(","), special_attack_groups
-            )
-        )
-        and (combatant.typeabbrseq not in special_attack_defenders)
-        and (combatant.is_alive())
-    ]
-
-    # remove attacker from defender list
-    special_attack_defenders = [
-        defender
+    # get defenders by typeabbrseq (ignoring groups) then by group membership
+    defenders = {
+        encounter.find_combatant(defender)
         for defender in special_attack_defenders
-        if defender != attacker.typeabbrseq
-    ]
+        if encounter.is_combatant(defender)
+    }
+    defenders |= encounter.find_group_combatants(special_attack_groups)
 
-    # get defenders (ignoring groups)
-    [
-        defenders.append(combatant)
-        for combatant in encounter.combatants
-        if combatant.typeabbrseq in special_attack_defenders
-    ]
+    # remove attacker from defender list
+    defenders.discard(attacker)
 
-    return defenders
+    # keep combatant list (initiative) order
+    return [combatant for combatant in encounter.combatants if combatant in defenders]
 
 
 def get_to_hit_roll(ui, encounter, combatant) -> int:
@@ -624,7 +648,7 @@ def get_to_hit_roll(ui, encounter, combatant) -> int:
                 to_hit_input = ""
                 continue
             else:
-                to_hit_roll = Dice.roll_die(encounter.TO_HIT_DIE)
+                to_hit_roll = encounter.dice.roll_die(encounter.TO_HIT_DIE)
                 break
 
         to_hit_roll = int(to_hit_input)
@@ -642,25 +666,6 @@ def get_to_hit_roll(ui, encounter, combatant) -> int:
     return to_hit_roll
 
 
-def has_common_substring_elements(list1: list, list2: list) -> bool:
-    """check if two lists have common substring elements
-    This function checks if any element in list1 is a substring of any element in list2 or vice versa.
-
-    Args:
-        list1 (_type_): list of elements to check against list2
-        list2 (_type_): list of elements to check against list1
-
-    Returns:
-        bool: True if any element in list1 is a substring of any element in list2 or vice versa, False otherwise
-    """
-    for item1 in list1:
-        for item2 in list2:
-            if str(item1) == str(item2) or str(item2) == str(item1):
-                return True
-
-    return False
-
-
 def initialize_round(ui, encounter) -> None:
     """initialize round for attacks
     args:
@@ -698,7 +703,7 @@ def log_hit_action(
         xp_earned: int value of earned xp
         message: str message to log
     """
-    encounter.combat_data.log_action(
+    encounter.combat_data.queue_log_action(
         encounter.encounter,
         encounter.round,
         attacker.combattype,
@@ -724,7 +729,7 @@ def log_hit_action(
     else:
         attacker.take_damage(damage)
 
-    encounter.combat_data.log_action(
+    encounter.combat_data.queue_log_action(
         encounter.encounter,
         encounter.round,
         attacker.combattype,
@@ -745,22 +750,6 @@ def log_hit_action(
         xp_earned,
         message + " AFTER",
     )
-    if isdefenderdamaged:
-        encounter.combat_data.update_combatant_hit_points(
-            defender.combattype,
-            defender.abbr,
-            defender.seq,
-            defender.hpmax,
-            defender.hp,
-        )  # update db with new post-damage hp
-    else:
-        encounter.combat_data.update_combatant_hit_points(
-            attacker.combattype,
-            attacker.abbr,
-            attacker.seq,
-            attacker.hpmax,
-            attacker.hp,
-        )
 
 
 def process_attack_sequence(ui, encounter) -> bool:
@@ -790,7 +779,7 @@ def process_attack_sequence(ui, encounter) -> bool:
             status_prompt = f"{ui.INDENT_LEVEL_02}Change initiative or inactive status? (<Enter> for initiative, new inactive status) "
             if len(status := get_input(ui, status_prompt)) == 0:
                 get_combatant_initiative(ui, encounter, attacker)
-                encounter.check_duplicate_initiative()
+                encounter.check_duplicate_initiative(attacker)
                 if attacker.initiative >= encounter.INITIATIVE_ACTIVE_MINIMUM:
                     attacker.inactivereason = ""
                     ui.output(
@@ -809,7 +798,7 @@ def process_attack_sequence(ui, encounter) -> bool:
         return False
 
     ui.output(
-        f"\n{ui.INDENT_LEVEL_01}{attacker.typeabbrseq} turn: {attacker.AttacksPerRound} attack(s)/round"
+        f"\n{ui.INDENT_LEVEL_01}{attacker.typeabbrseq} turn: {attacker.attacksperround} attack(s)/round"
     )
     ui.output(
         f"{ui.INDENT_LEVEL_02}{encounter.format_attack_type()} Attack #{encounter.combatant_attack_number}"
@@ -899,7 +888,7 @@ def process_attack_regular(ui, encounter, attacker) -> None:
         else:
             message += " hit"
 
-        damage = get_numeric_input(ui, f"{ui.INDENT_LEVEL_02}Enter {message} damage: ")
+        damage = get_damage_roll(ui, encounter, attacker, message)
         log_hit_action(
             encounter,
             attacker,
@@ -916,14 +905,13 @@ def process_attack_regular(ui, encounter, attacker) -> None:
             f"{ui.INDENT_LEVEL_03}{message} {defender.typeabbrseq} for {damage} points damage ({defender.hp} remaining)"
         )
         if defender.is_alive() == False:
-            encounter.foe_count -= 1
             attacker.defender_typeabbrseq = ""
 
         return
 
     # missed defender
     message += " missed"
-    encounter.combat_data.log_action(
+    encounter.combat_data.queue_log_action(
         encounter.encounter,
         encounter.round,
         attacker.combattype,
@@ -1064,17 +1052,19 @@ def process_attack_special(ui, encounter, attacker) -> None:
         ):
             is_damage_variable = False
 
+    # look up saving throws and auto-roll non-player saving throws for all defenders at once
+    if saving_throw_permitted:
+        saving_throws = encounter.get_saving_throws(
+            defenders, cm1.Saving_Throw.SAVING_THROW_TYPE[saving_throw_type]
+        )
+        auto_saving_throw_values = encounter.dice.roll_many(encounter.TO_HIT_DIE, 1, len(defenders))
+
     # process special attack vs. defenders
     for index, defender in enumerate(defenders, 1):
         ui.output(f"{ui.INDENT_LEVEL_02}Defender: {defender.typeabbrseq}")
         saving_throw_modifier = 1.0
         if saving_throw_permitted == True:
-            saving_throw = encounter.get_saving_throw(
-                defender.savingthrowclasstype,
-                defender.savingthrowlevel,
-                defender.savingthrowlevelpdm,
-                cm1.Saving_Throw.SAVING_THROW_TYPE[saving_throw_type],
-            )
+            saving_throw = int(saving_throws[index - 1])
             if defender.is_player_character():
                 saving_throw_value = 0
                 while saving_throw_value == 0:
@@ -1089,7 +1079,7 @@ def process_attack_special(ui, encounter, attacker) -> None:
                         saving_throw_value = saving_throw_value_raw
                         break
             else:
-                saving_throw_value = Dice.roll_die(encounter.TO_HIT_DIE)
+                saving_throw_value = int(auto_saving_throw_values[index - 1])
 
             if saving_throw_value >= saving_throw:
                 if saving_throw_half_damage:
@@ -1177,17 +1167,8 @@ def process_heal_combatants(ui, encounter) -> None:
     message = f"How many experience points for healing? "
     heal_xp = get_numeric_input(ui, message)
 
-    healer_combatant = None
-    for combatant in encounter.combatants:
-        if combatant.typeabbrseq == healer:
-            healer_combatant = combatant
-            break
-
-    healee_combatant = None
-    for combatant in encounter.combatants:
-        if combatant.typeabbrseq == healee:
-            healee_combatant = combatant
-            break
+    healer_combatant = encounter.find_combatant(healer)
+    healee_combatant = encounter.find_combatant(healee)
 
     log_hit_action(
         encounter,
@@ -1211,6 +1192,8 @@ def process_heal_combatants(ui, encounter) -> None:
         heal_xp,
         healing_method + " AFTER HEALING",
     )
+    encounter.persist_hit_points(encounter.HITPOINTS_PERSIST_ATTACK)
+    encounter.combat_data.flush_log_actions()  # one batch insert per heal
 
     message = f"{ui.INDENT_LEVEL_01}{healer_combatant.typeabbrseq} healed {healee_combatant.typeabbrseq} for {heal_points} hit points ({healee_combatant.hp} remaining) and earned {heal_xp} xp"
     ui.output(message)
@@ -1278,6 +1261,8 @@ def process_round(ui, encounter) -> None:
                     return
 
             checkforanotherattack = process_attack_sequence(ui, encounter)
+            encounter.persist_hit_points(encounter.HITPOINTS_PERSIST_ATTACK)
+            encounter.combat_data.flush_log_actions()  # one batch insert per attack
 
             # check for end of normal round (initiative is set to NONE after last attacker's attack)
             if encounter.initiative == encounter.INITIATIVE_NONE:
@@ -240,10 +240,38 @@ class TestCombatData(unittest.TestCase):
         bignumber = 9999999
         self.encounter.combat_data.log_initiative(bignumber, bignumber, 'TEST', 'ALIEL', 99, 'TEST', bignumber, bignumber, bignumber)
     
+    @identify
+    def test_log_actions(self):
+        bignumber = 9999999
+        action = (bignumber, bignumber, 'TEST', 'ALIEL', 99, 'TEST', bignumber, bignumber, 'TEST', 'TEST', bignumber, 'TEST', bignumber, bignumber, bignumber, bignumber, bignumber, bignumber, 'TEST LOG ACTIONS')
+        self.encounter.combat_data.log_actions([action, action])
+
+    @identify
+    def test_queue_log_action(self):
+        bignumber = 9999999
+        combat_data = self.encounter.combat_data
+        combat_data.queue_log_action(bignumber, bignumber, 'TEST', 'ALIEL', 99, 'TEST', bignumber, bignumber, 'TEST', 'TEST', bignumber, 'TEST', bignumber, bignumber, bignumber, bignumber, bignumber, bignumber, 'TEST QUEUE LOG ACTION')
+        self.assertEqual(len(combat_data.log_buffer), 1)
+        combat_data.flush_log_actions()
+        self.assertEqual(combat_data.log_buffer, [])
+
+    @identify
+    def test_queue_log_actions_size_threshold(self):
+        bignumber = 9999999
+        action = (bignumber, bignumber, 'TEST', 'ALIEL', 99, 'TEST', bignumber, bignumber, 'TEST', 'TEST', bignumber, 'TEST', bignumber, bignumber, bignumber, bignumber, bignumber, bignumber, 'TEST QUEUE LOG ACTIONS')
+        combat_data = self.encounter.combat_data
+        combat_data.queue_log_actions([action] * combat_data.LOG_BUFFER_SIZE)
+        self.assertEqual(combat_data.log_buffer, [])
+
     @identify
     def test_update_combatant_hit_points(self):
         self.encounter.combat_data.update_combatant_hit_points('FRIEND', 'ALIEL', 99, 99, 99)
         
+    @identify
+    def test_update_combatants_hit_points(self):
+        self.encounter.combat_data.update_combatants_hit_points([('FRIEND', 'ALIEL', 99, 99, 98), ('FRIEND', 'DORAN', 99, 99, 97)])
+
+
     @identify
     def test_delete_dead_foes(self):
         self.encounter.combat_data.update_combatant_hit_points('FOE', 'ANTG', 1, 99, 0)
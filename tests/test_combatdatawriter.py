@@ -0,0 +1,58 @@
+#test_combatdatawriter.py
+
+from lib.combatdatafactory import(
+    CombatDataFactory,
+)
+from lib.combatdatawriter import(
+    CombatDataWriter,
+)
+from lib.combatmodel import(
+    Encounter,
+)
+
+from unittest import(
+    TestCase,
+)
+
+class FailingCombatData:
+    def update_combatant_hit_points(self, *args):
+        raise RuntimeError('write failed')
+
+    def flush_log_actions(self):
+        pass
+
+    def close(self):
+        pass
+
+class FailingCombatDataFactory:
+    def create_combatdata(self):
+        return FailingCombatData(), None, None
+
+class TestCombatDataWriter(TestCase):
+    def test_background_writes(self):
+        encounter = Encounter(background_writes=True)
+        self.assertIsInstance(encounter.combat_data, CombatDataWriter)
+        encounter.load_participants()
+        encounter.load_combatants()
+        combatant = encounter.combatants[0]
+        encounter.combat_data.update_combatant_hit_points(combatant.combattype, combatant.abbr, combatant.seq, combatant.hpmax, combatant.hp - 1)
+        encounter.load_combatants()
+        self.assertEqual(encounter.find_combatant(combatant.typeabbrseq).hp, combatant.hp - 1)
+        encounter.combat_data.update_combatant_hit_points(combatant.combattype, combatant.abbr, combatant.seq, combatant.hpmax, combatant.hp)
+        encounter.combat_data.close()
+
+    def test_write_error_surfaces(self):
+        combat_data, _, _ = CombatDataFactory().create_combatdata()
+        writer = CombatDataWriter(combat_data, FailingCombatDataFactory())
+        writer.update_combatant_hit_points('FRIEND', 'ALIEL', 99, 99, 99)
+        with self.assertRaises(RuntimeError):
+            writer.join()
+        writer.close()
+
+    def test_backpressure(self):
+        combat_data, _, _ = CombatDataFactory().create_combatdata()
+        writer = CombatDataWriter(combat_data, queue_size=1)
+        for _ in range(10):
+            writer.queue_log_action(1, 1, 'TEST', 'ALIEL', 99, 'TEST', 1, 1, 'TEST', 'TEST', 1, 'TEST', 1, 1, 1, 1, 1, 1, 'TEST BACKPRESSURE')
+        writer.close()
+        self.assertTrue(writer.queue.empty())
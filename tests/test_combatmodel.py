@@ -1,9 +1,12 @@
 #test_combatmodel.py
 
+import os
 import temp.sqldb_access as sa1
 from lib.combatmodel import(
     Combatant,
     Encounter,
+    Saving_Throw,
+    SavingThrowTable,
 )
 
 from sqlalchemy import(
@@ -12,6 +15,9 @@ from sqlalchemy import(
     update as sa_update, 
 )
 
+from tempfile import(
+    TemporaryDirectory,
+)
 from unittest import(
     TestCase,
 )
@@ -266,3 +272,331 @@ class TestCombatModel(TestCase):
             with self.subTest(typeabbrseq=typeabbrseq):
                 #self.assertIsNone(self.encounter.find_combatant(abbrseq))
                 self.assertIsNone(self.encounter.find_combatant(typeabbrseq))
+
+    def test_columnar_store_counts(self):
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 0
+        self.encounter.attach_store()
+        self.assertIsNotNone(self.encounter.store)
+        self.assertEqual(self.encounter.count_combatants('FRIEND'), 4)
+        self.assertEqual(self.encounter.count_combatants('FOE'), 5)
+
+    def test_columnar_store_view(self):
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 0
+        self.encounter.attach_store()
+        for combatant in self.encounter.combatants:
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                combatant.hp = 7
+                self.assertEqual(self.encounter.store.hp[combatant.row], 7)
+
+    def test_columnar_store_damage_combatants(self):
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 0
+        self.encounter.attach_store()
+        defenders = [combatant for combatant in self.encounter.combatants if combatant.abbr == 'ANTG']
+        hp = [defender.hp for defender in defenders]
+        self.encounter.damage_combatants(defenders, 2)
+        self.assertEqual([defender.hp for defender in defenders], [value - 2 for value in hp])
+
+    def test_columnar_store_detach(self):
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 0
+        self.encounter.attach_store()
+        combatant = self.encounter.combatants[0]
+        combatant.hp = 3
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 100
+        self.encounter.attach_store()
+        self.assertIsNone(self.encounter.store)
+        self.assertIsNone(combatant.store)
+        self.assertEqual(combatant.hp, 3)
+
+    def test_participant_template_shared(self):
+        combatants = [combatant for combatant in self.encounter.combatants if combatant.abbr == 'ANTG']
+        for combatant in combatants:
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                self.assertIs(combatant.participant, self.encounter.get_participant_template('ANTG'))
+
+    def test_participant_template_reset(self):
+        template = self.encounter.get_participant_template('ANTG')
+        self.encounter.load_participants()
+        self.assertIsNot(self.encounter.get_participant_template('ANTG'), template)
+
+    def test_calculate_group_hitpoints(self):
+        for abbr in ['ANTG', 'APEC', 'DRREDAD']:
+            participant = self.encounter.get_participant_template(abbr)
+            hitpoints = Combatant.calculate_group_hitpoints(participant, 50, self.encounter.dice)
+            with self.subTest(abbr=abbr):
+                self.assertEqual(len(hitpoints), 50)
+                self.assertTrue((hitpoints > 0).all())
+
+    def test_combatant_index(self):
+        for combatant in self.encounter.combatants:
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                self.assertIs(self.encounter.find_combatant(combatant.typeabbrseq), combatant)
+                self.assertTrue(self.encounter.is_combatant(combatant.typeabbrseq))
+
+    def test_delete_dead_oponents_index(self):
+        defenders = [combatant for combatant in self.encounter.combatants if combatant.abbr == 'ANTG']
+        for defender in defenders:
+            defender.hp = -1
+        self.encounter.changed_hitpoints = {}  # keep database rows (only the combatant index is under test)
+        self.encounter.delete_dead_oponents()
+        for defender in defenders:
+            with self.subTest(typeabbrseq=defender.typeabbrseq):
+                self.assertNotIn(defender, self.encounter.combatants)
+                self.assertFalse(self.encounter.is_combatant(defender.typeabbrseq))
+
+    def test_find_group_combatants(self):
+        combatants = self.encounter.find_group_combatants(['O1'])
+        self.assertEqual({combatant.abbr for combatant in combatants}, {'ANTG', 'APEC', 'DRREDAD'})
+        self.assertEqual(self.encounter.find_group_combatants(['A0', 'O1']), set(self.encounter.combatants) - {self.encounter.find_combatant('FOAAA_DM99')})
+
+    def test_find_group_combatants_dead(self):
+        combatant = self.encounter.find_combatant('FOANTG99')
+        combatant.hp = -1
+        self.assertNotIn(combatant, self.encounter.find_group_combatants(['O1']))
+
+    def test_set_combatant_group(self):
+        combatant = self.encounter.find_combatant('FOANTG99')
+        self.encounter.set_combatant_group(combatant, 'O2,O3')
+        self.assertNotIn(combatant, self.encounter.find_group_combatants(['O1']))
+        self.assertEqual(self.encounter.find_group_combatants(['O3']), {combatant})
+
+    def test_find_next_attacker_order(self):
+        for initiative, combatant in enumerate(self.encounter.combatants, 1001):
+            combatant.initiative = initiative
+        self.encounter.sort_combatants_by_initiative()
+        self.encounter.check_duplicate_initiative()
+        self.encounter.ismissileattack = False
+        self.encounter.initiative = self.encounter.INITIATIVE_ACTIVE_MAXIMUM
+        attackers = []
+        while (attacker := self.encounter.find_next_attacker()) is not None:
+            attackers.append(attacker)
+            self.encounter.initiative -= 1
+        self.assertEqual(attackers, [combatant for combatant in self.encounter.combatants if combatant.can_attack()])
+
+    def test_find_next_attacker_missile(self):
+        for initiative, combatant in enumerate(self.encounter.combatants, 1001):
+            combatant.initiative = initiative
+        self.encounter.sort_combatants_by_initiative()
+        self.encounter.check_duplicate_initiative()
+        self.encounter.ismissileattack = True
+        self.encounter.initiative = self.encounter.INITIATIVE_ACTIVE_MAXIMUM
+        while (attacker := self.encounter.find_next_attacker()) is not None:
+            with self.subTest(typeabbrseq=attacker.typeabbrseq):
+                self.assertTrue(attacker.missileattack)
+            self.encounter.initiative -= 1
+
+    def test_find_next_attacker_dead(self):
+        self.encounter.ismissileattack = False
+        self.encounter.initiative = self.encounter.INITIATIVE_ACTIVE_MAXIMUM
+        attacker = self.encounter.find_next_attacker()
+        attacker.hp = -1
+        self.assertIsNot(self.encounter.find_next_attacker(), attacker)
+
+    def test_find_next_attacker_reschedule(self):
+        for initiative, combatant in enumerate(self.encounter.combatants, 1001):
+            combatant.initiative = initiative
+        self.encounter.sort_combatants_by_initiative()
+        self.encounter.check_duplicate_initiative()
+        self.encounter.ismissileattack = False
+        self.encounter.initiative = self.encounter.INITIATIVE_ACTIVE_MAXIMUM
+        attacker = self.encounter.find_next_attacker()
+        self.encounter.set_combatant_initiative(attacker, 1000)
+        self.assertIsNot(self.encounter.find_next_attacker(), attacker)
+
+    def test_check_duplicate_initiative(self):
+        for combatant in self.encounter.combatants:
+            combatant.initiative = 1000
+        self.encounter.sort_combatants_by_initiative()
+        self.encounter.check_duplicate_initiative()
+        initiatives = [combatant.initiative for combatant in self.encounter.combatants]
+        self.assertEqual(initiatives, list(range(1000 + len(initiatives) - 1, 999, -1)))
+
+    def test_check_duplicate_initiative_combatant(self):
+        for initiative, combatant in enumerate(self.encounter.combatants, 1001):
+            combatant.initiative = initiative
+        self.encounter.sort_combatants_by_initiative()
+        self.encounter.check_duplicate_initiative()
+        combatant = self.encounter.combatants[-1]
+        self.encounter.set_combatant_initiative(combatant, self.encounter.combatants[0].initiative)
+        self.encounter.check_duplicate_initiative(combatant)
+        initiatives = [combatant.initiative for combatant in self.encounter.combatants]
+        self.assertIs(self.encounter.combatants[0], combatant)
+        self.assertEqual(initiatives, sorted(set(initiatives), reverse=True))
+
+    def test_set_combatant_initiative(self):
+        for initiative, combatant in enumerate(reversed(self.encounter.combatants), 1001):
+            self.encounter.set_combatant_initiative(combatant, initiative)
+            initiatives = [combatant.initiative for combatant in self.encounter.combatants]
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                self.assertEqual(initiatives, sorted(initiatives, reverse=True))
+
+    def test_get_saving_throw(self):
+        for attacktype in Saving_Throw.SAVING_THROW_TYPE:
+            with self.subTest(attacktype=attacktype):
+                self.assertGreater(self.encounter.get_saving_throw('FI', 1, 1, attacktype), 0)
+                self.assertEqual(self.encounter.get_saving_throw('XX', 1, 1, attacktype), 0)
+
+    def test_get_saving_throws(self):
+        for attacktype in Saving_Throw.SAVING_THROW_TYPE:
+            savingthrows = self.encounter.get_saving_throws(self.encounter.combatants, attacktype)
+            for combatant, savingthrow in zip(self.encounter.combatants, savingthrows):
+                with self.subTest(attacktype=attacktype, typeabbrseq=combatant.typeabbrseq):
+                    self.assertEqual(
+                        savingthrow,
+                        self.encounter.get_saving_throw(
+                            combatant.savingthrowclasstype,
+                            combatant.savingthrowlevel,
+                            combatant.savingthrowlevelpdm,
+                            attacktype,
+                        ),
+                    )
+
+    def test_get_saving_throws_irregular_level(self):
+        defenders = self.encounter.combatants + [
+            Combatant('FOE', 'O9', 1, 10, participant=self.encounter.get_participant_template(abbr))
+            for abbr in ['SHEDU', 'SPIDPH']
+        ]
+        for attacktype in Saving_Throw.SAVING_THROW_TYPE:
+            savingthrows = self.encounter.get_saving_throws(defenders, attacktype)
+            for combatant, savingthrow in zip(defenders, savingthrows):
+                with self.subTest(attacktype=attacktype, typeabbrseq=combatant.typeabbrseq):
+                    self.assertEqual(
+                        savingthrow,
+                        self.encounter.get_saving_throw(
+                            combatant.savingthrowclasstype,
+                            combatant.savingthrowlevel,
+                            combatant.savingthrowlevelpdm,
+                            attacktype,
+                        ),
+                    )
+
+    def test_saving_throw_table_duplicate_row(self):
+        table = SavingThrowTable([
+            Saving_Throw('F', 1, 14, 15, 16, 17, 17),
+            Saving_Throw('F', 1, 10, 10, 10, 10, 10),
+        ])
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.get_saving_throw('F', 1, 1, 'spell'), 17)
+        self.assertEqual(list(table.get_saving_throws(['F'], [1], [1], 'spell')), [17])
+
+    def test_count_combatants_take_damage(self):
+        combatant = self.encounter.find_combatant('FOANTG99')
+        combatant.take_damage(combatant.hp)
+        self.assertEqual(self.encounter.count_combatants('FOE'), 4)
+        combatant.take_damage(-1)
+        self.assertEqual(self.encounter.count_combatants('FOE'), 5)
+
+    def test_count_combatants_friend_unconscious(self):
+        combatant = self.encounter.find_combatant('FRALIEL99')
+        combatant.hp = 0
+        self.assertEqual(self.encounter.count_combatants('FRIEND'), 3)
+        combatant.regenerate_hitpoints()
+        combatant.take_damage(-combatant.hpmax)
+        self.assertEqual(self.encounter.count_combatants('FRIEND'), 4)
+
+    def test_columnar_store_count_combatants_damage(self):
+        self.encounter.COMBATANTS_COLUMNAR_MINIMUM = 0
+        self.encounter.attach_store()
+        defenders = [combatant for combatant in self.encounter.combatants if combatant.group == 'O1']
+        self.encounter.damage_combatants(defenders, 1000)
+        self.assertEqual(self.encounter.count_combatants('FOE'), 0)
+        self.assertEqual(self.encounter.count_combatants('FRIEND'), 4)
+
+    def test_regeneration_tracks_regenerators(self):
+        for combatant in self.encounter.combatants:
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                self.assertEqual(combatant in self.encounter.regeneration.combatants, combatant.regenerationhitpoint != 0)
+
+    def test_regenerate_combatants(self):
+        regenerators = list(self.encounter.regeneration.combatants)
+        for combatant in regenerators:
+            combatant.take_damage(1)
+        for _ in range(10):
+            self.encounter.regenerate_combatants()
+        for combatant in regenerators:
+            with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                self.assertTrue(
+                    combatant.hp == combatant.hpmax
+                    or (combatant.regenerationroundstart == 0 and combatant.regenerateafterdamage)
+                )
+
+    def test_snapshot_restore(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'encounter.snapshot')
+            self.encounter.round = 3
+            self.encounter.set_combatant_initiative(self.encounter.find_combatant('FOAPEC99'), 5000)
+            self.encounter.snapshot(filename)
+            rolls = list(self.encounter.dice.roll_many(20, 1, 10))
+
+            encounter = Encounter()
+            encounter.restore(filename)
+            self.assertEqual(encounter.round, 3)
+            self.assertEqual(list(encounter.dice.roll_many(20, 1, 10)), rolls)
+            self.assertEqual(
+                [combatant.typeabbrseq for combatant in encounter.combatants],
+                [combatant.typeabbrseq for combatant in self.encounter.combatants],
+            )
+            for combatant in self.encounter.combatants:
+                restored = encounter.find_combatant(combatant.typeabbrseq)
+                with self.subTest(typeabbrseq=combatant.typeabbrseq):
+                    self.assertEqual(
+                        [getattr(restored, name) for name in Encounter.SNAPSHOT_STATE],
+                        [getattr(combatant, name) for name in Encounter.SNAPSHOT_STATE],
+                    )
+            self.assertEqual(encounter.count_combatants('FOE'), self.encounter.count_combatants('FOE'))
+
+    def test_restore_keeps_database_hit_points(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'encounter.snapshot')
+            combatant = self.encounter.find_combatant('FOANTG99')
+            self.encounter.snapshot(filename)
+            combatant.take_damage(1)
+            self.encounter.persist_hit_points()
+
+            encounter = Encounter()
+            encounter.restore(filename)
+            self.assertEqual(encounter.find_combatant('FOANTG99').hp, combatant.hp)
+            self.assertEqual(encounter.changed_hitpoints, {})
+
+    def test_remove_checkpoint(self):
+        with TemporaryDirectory() as directory:
+            self.encounter.checkpoint_file = os.path.join(directory, 'encounter.checkpoint')
+            self.encounter.snapshot()
+            self.encounter.remove_checkpoint()
+            self.assertFalse(os.path.exists(self.encounter.checkpoint_file))
+
+    def test_prepare_next_round_checkpoint(self):
+        with TemporaryDirectory() as directory:
+            self.encounter.checkpoint_file = os.path.join(directory, 'encounter.checkpoint')
+            self.encounter.prepare_next_round()
+            encounter = Encounter(checkpoint_file=self.encounter.checkpoint_file)
+            encounter.restore()
+            self.assertEqual(encounter.round, self.encounter.round)
+
+    def test_changed_hitpoints_tracked(self):
+        self.assertEqual(self.encounter.changed_hitpoints, {})
+        combatant = self.encounter.find_combatant('FOAPEC99')
+        for _ in range(5):
+            combatant.take_damage(1)
+        self.assertEqual(list(self.encounter.changed_hitpoints), [combatant])
+
+    def test_changed_hitpoints_unchanged_value(self):
+        combatant = self.encounter.find_combatant('FOAPEC99')
+        combatant.hp = combatant.hp
+        combatant.hpmax = combatant.hpmax
+        self.assertEqual(self.encounter.changed_hitpoints, {})
+
+    def test_persist_hit_points(self):
+        combatant = self.encounter.find_combatant('FOANTG99')
+        combatant.take_damage(1)
+        self.encounter.persist_hit_points()
+        self.assertEqual(self.encounter.changed_hitpoints, {})
+        self.encounter.load_combatants()
+        self.assertEqual(self.encounter.find_combatant('FOANTG99').hp, combatant.hp)
+
+    def test_persist_hit_points_boundary(self):
+        self.encounter.hitpoints_persist = self.encounter.HITPOINTS_PERSIST_ROUND
+        self.encounter.find_combatant('FOANTG99').take_damage(1)
+        self.encounter.persist_hit_points(self.encounter.HITPOINTS_PERSIST_ATTACK)
+        self.assertEqual(len(self.encounter.changed_hitpoints), 1)
+        self.encounter.persist_hit_points(self.encounter.HITPOINTS_PERSIST_ROUND)
+        self.assertEqual(self.encounter.changed_hitpoints, {})
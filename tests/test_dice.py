@@ -0,0 +1,169 @@
+#test_dice.py
+
+from lib.dice import(
+    Dice,
+    DiceBuffer,
+    DiceDistribution,
+    DiceStreams,
+)
+
+import numpy as np
+from unittest import(
+    TestCase,
+)
+
+class TestDice(TestCase):
+    ROLLS = 10000
+
+    def test_roll_many_shape(self):
+        results = Dice.roll_many(6, 3, self.ROLLS)
+        self.assertEqual(len(results), self.ROLLS)
+
+    def test_roll_many_range(self):
+        results = Dice.roll_many(6, 3, self.ROLLS, 0, 2)
+        self.assertGreaterEqual(results.min(), 5)
+        self.assertLessEqual(results.max(), 20)
+
+    def test_roll_many_die_modifier(self):
+        results = Dice.roll_many(4, 2, self.ROLLS, 2)
+        self.assertGreaterEqual(results.min(), 2)
+        self.assertLessEqual(results.max(), 12)
+
+    def test_roll_many_no_dice(self):
+        results = Dice.roll_many(6, 0, 5, 0, 3)
+        self.assertEqual(list(results), [3, 3, 3, 3, 3])
+
+    def test_roll_many_die_sides_per_roll(self):
+        results = Dice.roll_many(np.array([1, 1, 6]), 2, 3)
+        self.assertEqual(list(results[:2]), [2, 2])
+        self.assertTrue(2 <= results[2] <= 12)
+
+    def test_roll_dice(self):
+        for _ in range(100):
+            roll = Dice.roll_dice(8, 2, 0, 1)
+            with self.subTest(roll=roll):
+                self.assertIsInstance(roll, int)
+                self.assertTrue(3 <= roll <= 17)
+
+    def test_roll_dice_many_dice(self):
+        for _ in range(100):
+            roll = Dice.roll_dice(6, Dice.SCALAR_DICE_MAXIMUM + 6, 0, 1)
+            with self.subTest(roll=roll):
+                self.assertIsInstance(roll, int)
+                self.assertTrue(Dice.SCALAR_DICE_MAXIMUM + 7 <= roll <= 6 * (Dice.SCALAR_DICE_MAXIMUM + 6) + 1)
+
+    def test_roll_die(self):
+        rolls = {Dice.roll_die(20) for _ in range(2000)}
+        self.assertEqual(rolls, set(range(1, 21)))
+
+    def test_roll_dNN(self):
+        for sides, roll in [
+            (4, Dice.roll_d4),
+            (6, Dice.roll_d6),
+            (8, Dice.roll_d8),
+            (10, Dice.roll_d10),
+            (12, Dice.roll_d12),
+            (20, Dice.roll_d20),
+            (100, Dice.roll_d100),
+        ]:
+            with self.subTest(sides=sides):
+                self.assertTrue(1 <= roll() <= sides)
+
+
+class TestDiceDistribution(TestCase):
+    def test_for_roll_single_die(self):
+        distribution = DiceDistribution.for_roll(6)
+        self.assertEqual(distribution.minimum, 1)
+        self.assertEqual(distribution.maximum, 6)
+        for value in range(1, 7):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(distribution.probability(value), 1 / 6)
+
+    def test_for_roll_modifiers(self):
+        distribution = DiceDistribution.for_roll(6, 3, 1, 2)
+        self.assertEqual(distribution.minimum, 5)
+        self.assertEqual(distribution.maximum, 23)
+        self.assertAlmostEqual(distribution.mean(), 3 * 4 + 2)
+
+    def test_for_roll_2d6(self):
+        distribution = DiceDistribution.for_roll(6, 2)
+        self.assertAlmostEqual(distribution.probability(7), 6 / 36)
+        self.assertAlmostEqual(distribution.probability_at_most(4), 6 / 36)
+        self.assertAlmostEqual(distribution.probability_at_least(11), 3 / 36)
+        self.assertAlmostEqual(distribution.variance(), 2 * 35 / 12)
+
+    def test_for_roll_no_dice(self):
+        distribution = DiceDistribution.for_roll(6, 0, 0, 4)
+        self.assertEqual(distribution.probability(4), 1.0)
+
+    def test_for_roll_cached(self):
+        self.assertIs(DiceDistribution.for_roll(8, 4), DiceDistribution.for_roll(8, 4))
+
+    def test_add(self):
+        distribution = DiceDistribution.for_roll(6) + DiceDistribution.for_roll(6)
+        self.assertTrue(np.allclose(distribution.pmf, DiceDistribution.for_roll(6, 2).pmf))
+
+    def test_pmf_sums_to_one(self):
+        distribution = DiceDistribution.for_roll(20, 15)
+        self.assertAlmostEqual(float(distribution.pmf.sum()), 1.0)
+        self.assertAlmostEqual(float(distribution.cdf[-1]), 1.0)
+
+    def test_pmf_read_only(self):
+        distribution = DiceDistribution.for_roll(4, 2)
+        with self.assertRaises(ValueError):
+            distribution.pmf[0] = 1.0
+
+
+class TestDiceStreams(TestCase):
+    def test_spawn_reproducible(self):
+        dice1 = DiceStreams(1234).spawn_dice()
+        dice2 = DiceStreams(1234).spawn_dice()
+        self.assertEqual(list(dice1.roll_many(20, 1, 100)), list(dice2.roll_many(20, 1, 100)))
+
+    def test_spawn_independent(self):
+        dice1, dice2 = DiceStreams(1234).spawn(2)
+        self.assertNotEqual(list(dice1.roll_many(20, 1, 100)), list(dice2.roll_many(20, 1, 100)))
+
+    def test_spawn_bound(self):
+        dice = DiceStreams(1234).spawn_dice()
+        self.assertTrue(issubclass(dice, Dice))
+        self.assertIsNot(dice.rng, Dice.rng)
+        self.assertTrue(1 <= dice.roll_d6() <= 6)
+
+    def test_spawn_streams(self):
+        streams1 = DiceStreams(99).spawn_streams(2)
+        streams2 = DiceStreams(99).spawn_streams(2)
+        for stream1, stream2 in zip(streams1, streams2):
+            with self.subTest(entropy=stream1.entropy):
+                self.assertEqual(stream1.spawn_dice().roll_d100(), stream2.spawn_dice().roll_d100())
+
+
+class TestDiceBuffer(TestCase):
+    def test_draw_range(self):
+        buffer = DiceBuffer(np.random.default_rng(7), 64)
+        rolls = {buffer.draw(6) for _ in range(1000)}
+        self.assertEqual(rolls, set(range(1, 7)))
+
+    def test_draw_refills_per_die_size(self):
+        buffer = DiceBuffer(np.random.default_rng(7), 8)
+        buffer.draw(20)
+        buffer.draw(6)
+        self.assertEqual(len(buffer.blocks[20]), 7)
+        self.assertEqual(len(buffer.blocks[6]), 7)
+        for _ in range(8):
+            buffer.draw(20)
+        self.assertEqual(len(buffer.blocks[20]), 7)
+
+    def test_draw_uniform(self):
+        buffer = DiceBuffer(np.random.default_rng(7))
+        counts = np.bincount([buffer.draw(20) for _ in range(40000)], minlength=21)[1:]
+        self.assertTrue(np.all(np.abs(counts - 2000) < 300))
+
+    def test_buffered_dice(self):
+        dice = DiceStreams(1234).spawn_dice().buffered(16)
+        self.assertIsNotNone(dice.buffer)
+        self.assertIs(dice.buffer.rng, dice.rng)
+        self.assertTrue(1 <= dice.roll_d20() <= 20)
+        self.assertTrue(5 <= dice.roll_d6(3, 0, 2) <= 20)
+        self.assertEqual(dice.roll_dice(6, 0, 0, 3), 3)
+        self.assertIsNone(Dice.buffer)
@@ -0,0 +1,79 @@
+#test_diceexpression.py
+
+from lib.diceexpression import(
+    DamagePlan,
+    DiceTerm,
+)
+
+from unittest import(
+    TestCase,
+)
+
+class TestDamagePlan(TestCase):
+    def test_compile_attacks(self):
+        plan = DamagePlan.compile("1d8/1d8/2d6+1")
+        self.assertEqual(plan.options, ((DiceTerm(1, 8, 0), DiceTerm(1, 8, 0), DiceTerm(2, 6, 1)),))
+
+    def test_compile_options(self):
+        plan = DamagePlan.compile("Bow: 1d6/1d6|Spear: 1d6/1d8")
+        self.assertEqual(len(plan.options), 2)
+        self.assertEqual(plan.get_term(2, 1), DiceTerm(1, 8, 0))
+
+    def test_compile_labels(self):
+        plan = DamagePlan.compile("1d6 CLAW; 1d6 CLAW; 1d8 (bite) or weapon")
+        self.assertEqual(plan.options, ((DiceTerm(1, 6, 0), DiceTerm(1, 6, 0), DiceTerm(1, 8, 0)),))
+
+    def test_compile_multiplier(self):
+        plan = DamagePlan.compile("2d8 (x2); 2d6 (X3)")
+        self.assertEqual([str(plan.get_term(attack)) for attack in range(1, 6)], ["2d8", "2d8", "2d6", "2d6", "2d6"])
+        self.assertEqual(DamagePlan.compile("1d4+1(x2)/2d4").get_term(2), DiceTerm(1, 4, 1))
+
+    def test_compile_modifier_stops_before_term(self):
+        for expression in ["1d4+1d4", "1d6-2d4", "1d4+12d4"]:
+            with self.subTest(expression=expression):
+                self.assertFalse(DamagePlan.compile(expression))
+
+    def test_compile_not_simple(self):
+        for expression in [
+            "1d8+1 (SM) 1d12+1 (L)",
+            "SPEAR: 1d6 (SM); 1d8 (L)",
+            "1d6/2; 1d6/2; 1d4+1 or by weapon",
+            "d6+1/d6+1 or weapon +6",
+            "Bow: 1d6/1d6|- kills all trolls 2/day",
+        ]:
+            with self.subTest(expression=expression):
+                self.assertFalse(DamagePlan.compile(expression))
+
+    def test_compile_modifiers(self):
+        plan = DamagePlan.compile("+5 Scimitar: 1d12+5+6/1d4 - 1")
+        self.assertEqual(plan.options, ((DiceTerm(1, 12, 11), DiceTerm(1, 4, -1)),))
+
+    def test_compile_empty(self):
+        for expression in [None, "", "Attacks 3/2", "by weapon or spell"]:
+            with self.subTest(expression=expression):
+                self.assertFalse(DamagePlan.compile(expression))
+
+    def test_compile_cached(self):
+        self.assertIs(DamagePlan.compile("2d4/2d4"), DamagePlan.compile("2d4/2d4"))
+
+    def test_get_term_cycles(self):
+        plan = DamagePlan.compile("1d8/1d8/2d6+1")
+        self.assertEqual(plan.get_term(4), DiceTerm(1, 8, 0))
+        self.assertEqual(str(plan.get_term(3)), "2d6+1")
+
+    def test_roll(self):
+        plan = DamagePlan.compile("2d6+1")
+        for _ in range(100):
+            damage = plan.roll()
+            with self.subTest(damage=damage):
+                self.assertTrue(3 <= damage <= 13)
+
+    def test_roll_many(self):
+        damage = DamagePlan.compile("1d4+4").roll_many(1000)
+        self.assertEqual(len(damage), 1000)
+        self.assertGreaterEqual(damage.min(), 5)
+        self.assertLessEqual(damage.max(), 8)
+
+    def test_distribution(self):
+        distribution = DamagePlan.compile("1d8/1d8/2d6+1").distribution(3)
+        self.assertAlmostEqual(distribution.mean(), 8.0)
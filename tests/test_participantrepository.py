@@ -0,0 +1,53 @@
+#test_participantrepository.py
+
+from lib.combatdatafactory import(
+    CombatDataFactory,
+)
+from lib.participantrepository import(
+    ParticipantRepository,
+)
+
+from unittest import(
+    TestCase,
+)
+
+class TestParticipantRepository(TestCase):
+    def setUp(self):
+        self.combat_data, _, _ = CombatDataFactory().create_combatdata()
+
+    def tearDown(self):
+        self.combat_data.close()
+
+    def test_get(self):
+        participants = ParticipantRepository(self.combat_data)
+        participant = participants['ANTG']
+        self.assertEqual(participant['Abbr'], 'ANTG')
+        self.assertIn('ANTG', participants)
+        self.assertIs(participants['ANTG'], participant)
+
+    def test_get_unknown(self):
+        participants = ParticipantRepository(self.combat_data)
+        with self.assertRaises(KeyError):
+            participants['*UNKNOWN*']
+
+    def test_prefetch(self):
+        participants = ParticipantRepository(self.combat_data)
+        participants.prefetch(['ANTG', 'ALIEL', 'ANTG', 'ERIC'])
+        self.assertEqual(len(participants), 3)
+
+    def test_prefetch_matches_catalog(self):
+        self.combat_data.load_participants()
+        participants = ParticipantRepository(self.combat_data)
+        participants.prefetch(['ANTG', 'TROLL'])
+        for abbr in ['ANTG', 'TROLL']:
+            with self.subTest(abbr=abbr):
+                self.assertEqual(participants[abbr], self.combat_data.participants[abbr])
+
+    def test_cache_bounded(self):
+        participants = ParticipantRepository(self.combat_data, 2)
+        participants.prefetch(['ANTG', 'ALIEL'])
+        participants['ANTG']
+        participants['ERIC']
+        self.assertEqual(len(participants), 2)
+        self.assertIn('ANTG', participants)
+        self.assertNotIn('ALIEL', participants)
@@ -0,0 +1,95 @@
+#test_session.py
+
+from lib.combatmodel import(
+    Encounter,
+)
+from lib.session import(
+    SessionManager,
+)
+
+from unittest import(
+    TestCase,
+)
+
+class FailingCombatDataFactory:
+    def create_combatdata(self):
+        raise RuntimeError('connect failed')
+
+class TestSessionManager(TestCase):
+    def test_create_session(self):
+        sessions = SessionManager()
+        session_id, encounter = sessions.create_session()
+        self.assertIsInstance(encounter, Encounter)
+        self.assertIs(sessions.get_session(session_id), encounter)
+        sessions.close()
+
+    def test_sessions_isolated(self):
+        sessions = SessionManager(pool_size=2)
+        _, encounter1 = sessions.create_session()
+        _, encounter2 = sessions.create_session()
+        encounter1.load_participants()
+        encounter1.load_combatants()
+        self.assertIsNot(encounter1.combatants, encounter2.combatants)
+        self.assertEqual(len(encounter2.combatants), 0)
+        self.assertIsNot(encounter1.combat_data, encounter2.combat_data)
+        sessions.close()
+
+    def test_pool_reuses_connection(self):
+        sessions = SessionManager(pool_size=1)
+        session_id, encounter1 = sessions.create_session()
+        sessions.close_session(session_id)
+        _, encounter2 = sessions.create_session()
+        self.assertIs(encounter2.combat_data, encounter1.combat_data)
+        self.assertEqual(sessions.connections, 1)
+        sessions.close()
+        self.assertEqual(sessions.connections, 0)
+
+    def test_pool_exhausted(self):
+        sessions = SessionManager(pool_size=1)
+        sessions.create_session()
+        with self.assertRaises(TimeoutError):
+            sessions.create_session('table2', timeout=0.01)
+        self.assertNotIn('table2', sessions)
+        sessions.close()
+
+    def test_close_session_being_created(self):
+        sessions = SessionManager()
+        sessions.sessions['table1'] = None  # reserved by a create_session still connecting
+        with self.assertRaises(KeyError):
+            sessions.close_session('table1')
+        sessions.close()
+        self.assertIn('table1', sessions)
+
+    def test_create_session_failed(self):
+        sessions = SessionManager(pool_size=1, combat_data_factory=FailingCombatDataFactory())
+        with self.assertRaises(RuntimeError):
+            sessions.create_session('table1')
+        self.assertNotIn('table1', sessions)
+        self.assertEqual(sessions.connections, 0)
+        sessions.close()
+
+    def test_pool_size_invalid(self):
+        with self.assertRaises(ValueError):
+            SessionManager(pool_size=0)
+
+    def test_sessions_own_connection(self):
+        sessions = SessionManager()
+        _, encounter1 = sessions.create_session()
+        _, encounter2 = sessions.create_session()
+        self.assertIsNot(encounter1.combat_data, encounter2.combat_data)
+        sessions.close()
+
+    def test_session_duplicate(self):
+        sessions = SessionManager()
+        sessions.create_session('table1')
+        with self.assertRaises(KeyError):
+            sessions.create_session('table1')
+        sessions.close()
+
+    def test_close_session(self):
+        sessions = SessionManager()
+        session_id, _ = sessions.create_session()
+        sessions.close_session(session_id)
+        self.assertNotIn(session_id, sessions)
+        self.assertEqual(len(sessions), 0)
+        sessions.close()